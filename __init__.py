@@ -1,28 +1,8 @@
-import logging
 from .core.initialize import initialize_application
+from .utils.logger import configure_logging
 
-# Configure root logger
-logging.basicConfig(
-    level=logging.WARNING,
-    format='%(asctime)s - %(message)s'
-)
-
-# Set specific loggers to appropriate levels
-logging.getLogger('agentic_ai').setLevel(logging.INFO)
-
-# Silence everything except our narrative logs
-noisy_loggers = [
-    'agentic_ai.tools',
-    'httpx',
-    'httpcore',
-    'asyncio',
-    'aiohttp',
-    'uvicorn',
-    'uvicorn.error',
-    'fastapi'
-]
-for logger_name in noisy_loggers:
-    logging.getLogger(logger_name).setLevel(logging.WARNING)
+# Route logging through the non-blocking queue pipeline (see LOG_* settings)
+configure_logging()
 
 # Initialize application components and get factory
 factory = initialize_application()
@@ -1,11 +1,52 @@
+from core.startup import StartupTimer  # First, so startup phases cover every import below
+from contextlib import asynccontextmanager
+from typing import Dict, Any
+import asyncio
+import json
+import logging
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse, Response
 from core.messages import ChatRequest, ChatResponse
+from core.constants import EVENT_THREAD_STATUS, STATUS_ERROR, THREAD_ERROR
+from core.compaction import CompactionStats
+from core.metrics import render_metrics, METRICS_CONTENT_TYPE
+from core.http_client import get_http_client
+from core.config_watcher import ConfigWatcher
 from main import AgenticAIApplication
 from core.initialize import initialize_application
+from utils.logger import configure_logging, shutdown_logging
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+startup = StartupTimer()
+startup.mark('imports')
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background work on startup and release shared resources on shutdown
+    
+    The OpenAI client and aiohttp are built in a thread once the app is ready,
+    so they do not delay startup; the HTTP pool opens on the first tool call.
+    """
+    config_watcher.start()
+    startup.mark('lifespan')
+    logger.info(f"Ready to serve: {startup.report()}")
+    warm_up = asyncio.create_task(asyncio.to_thread(app_instance.warm_up))
+    try:
+        yield
+    finally:
+        await warm_up
+        await config_watcher.stop()
+        await get_http_client().close()
+        await app_instance.close()
+        shutdown_logging()
+
+configure_logging()
+app = FastAPI(lifespan=lifespan)
 factory = initialize_application()
+startup.mark('registry')
 app_instance = AgenticAIApplication(factory=factory)
+config_watcher = ConfigWatcher(app_instance, app_instance.settings.CONFIG_WATCH_INTERVAL)
+startup.mark('application')
 
 @app.post("/chat")
 async def chat(request: ChatRequest) -> ChatResponse:
@@ -15,7 +56,127 @@ async def chat(request: ChatRequest) -> ChatResponse:
         conversation_id=request.conversation_id,
         thread_id=request.thread_id,
         session_id=request.session_id,
-        user_id=request.user_id
+        user_id=request.user_id,
+        delta=request.delta
     )
     
-    return ChatResponse(**result) 
\ No newline at end of file
+    return ChatResponse(**result) 
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest) -> StreamingResponse:
+    """Process a chat request, streaming tokens and progress as Server-Sent Events"""
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def on_event(event: str, data: Dict[str, Any]):
+        await queue.put(format_sse(event, data))
+    
+    async def run():
+        try:
+            result = await app_instance.process_request(
+                messages=request.messages,
+                conversation_id=request.conversation_id,
+                thread_id=request.thread_id,
+                session_id=request.session_id,
+                user_id=request.user_id,
+                on_event=on_event,
+                delta=request.delta
+            )
+            status = {key: value for key, value in result.items() if key != "messages"}
+        except Exception as e:
+            # The client still gets a final status event for a request that failed outright
+            logger.exception("Error processing streamed request")
+            status = {
+                "result": STATUS_ERROR,
+                "conversation_id": request.conversation_id,
+                "thread_id": request.thread_id,
+                "session_id": request.session_id,
+                "thread_status": THREAD_ERROR,
+                "error_details": str(e)
+            }
+        await queue.put(format_sse(EVENT_THREAD_STATUS, status))
+        await queue.put(None)
+    
+    async def events():
+        task = asyncio.create_task(run())
+        try:
+            while (chunk := await queue.get()) is not None:
+                yield chunk
+        finally:
+            # Client went away - stop working on its turn
+            if not task.done():
+                task.cancel()
+            # Wait for the turn to wind down so its outcome is always retrieved
+            await asyncio.gather(task, return_exceptions=True)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/startup")
+async def startup_report() -> dict:
+    """How long this process took to become ready, by startup phase"""
+    return startup.report()
+
+@app.post("/config/reload")
+async def reload_config() -> dict:
+    """Reload config/ now if it changed (this worker only); the watcher does the same every CONFIG_WATCH_INTERVAL"""
+    reloaded = await config_watcher.reload()
+    return {"reloaded": reloaded, **config_watcher.stats()}
+
+@app.get("/config/stats")
+async def config_stats() -> dict:
+    """Config reloads applied and rejected, with the last error"""
+    return config_watcher.stats()
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    """Prometheus metrics: agent, LLM and tool latency, tool errors, routing and thread outcomes"""
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/usage/stats")
+async def usage_stats() -> dict:
+    """Token and cost totals per agent and per user, and the configured budgets"""
+    return app_instance.usage.report()
+
+@app.get("/router/stats")
+async def router_stats() -> dict:
+    """Local triage router hit rate (how many triage LLM calls were skipped)"""
+    router = app_instance.agents['agent_triage'].router
+    return router.stats() if router else {"enabled": False}
+
+@app.get("/prompt_cache/stats")
+async def prompt_cache_stats() -> dict:
+    """Per-agent prompt tokens, cached tokens and prompt-cache hit rate"""
+    return app_instance.client.cache_stats.report()
+
+@app.get("/rate_limit/stats")
+async def rate_limit_stats() -> dict:
+    """LLM scheduler admissions, queue depth and remaining request/token budget"""
+    return app_instance.client.scheduler.stats()
+
+@app.get("/tools/stats")
+async def tool_stats() -> dict:
+    """Per-tool call, retry and hedge counts, p95 latency and circuit breaker state"""
+    registry = app_instance.factory.tool_registry
+    return {
+        name: tool.policy.stats()
+        for name in registry.available_tools
+        if getattr(tool := registry.get_tool(name), 'policy', None)
+    }
+
+@app.get("/cassette/stats")
+async def cassette_stats() -> dict:
+    """Recorded, replayed and missed exchanges for the record/replay cassette"""
+    cassette = app_instance.cassette
+    return cassette.stats() if cassette else {"mode": "off"}
+
+@app.get("/compaction/stats")
+async def compaction_stats() -> dict:
+    """Estimated tool-result tokens before and after output compaction, per tool"""
+    return CompactionStats().report()
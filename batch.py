@@ -0,0 +1,194 @@
+"""Offline batch runner: stream a JSONL file of ChatRequest records through the agent system
+
+    python batch.py conversations.jsonl results.jsonl --concurrency 16
+
+Each output line holds the input line number, the latency and either the
+ChatResponse or the error. The output file is also the checkpoint: rerunning
+the same command skips lines that already have a result.
+"""
+from typing import Dict, Any, List, Optional, Set, Iterator, Tuple
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from core.load_env import load_environment
+from core.messages import ChatRequest, ChatResponse
+from core.constants import THREAD_ERROR
+from core.http_client import get_http_client
+from core.initialize import initialize_application
+from main import AgenticAIApplication
+from utils.logger import configure_logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+PERCENTILES = (50, 90, 95, 99)
+
+def read_requests(path: str, done: Set[int]) -> Iterator[Tuple[int, str]]:
+    """Yield (line number, raw line) for input lines that still need a result"""
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip() and line_number not in done:
+                yield line_number, line
+
+def load_checkpoint(path: str, retry_errors: bool) -> Set[int]:
+    """Get the input lines already answered in an earlier run's output
+    
+    A line cut short by an interrupted run is truncated so new results start
+    on a clean line.
+    """
+    if not os.path.exists(path):
+        return set()
+    
+    done = set()
+    with open(path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            logger.warning(f"Dropping incomplete last line of {path}")
+            f.truncate(end)
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not (retry_errors and record.get('error')):
+                done.add(record['line'])
+    return done
+
+def percentile(ordered: List[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+class BatchRunner:
+    """Runs requests with bounded concurrency and appends each result as it finishes"""
+    
+    def __init__(self, app, output, concurrency: int):
+        self.app = app
+        self.output = output
+        self.concurrency = concurrency
+        self.latencies: List[float] = []
+        self.succeeded = 0
+        self.failed = 0
+    
+    async def run(self, requests: Iterator[Tuple[int, str]]):
+        """Process all requests; a worker that fails (e.g. the output cannot be written) stops the batch"""
+        # A small queue keeps memory flat however large the input file is
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+        producer = asyncio.create_task(self._produce(queue, requests))
+        tasks = [producer, *workers]
+        try:
+            # Without watching the workers, the producer would block on a full queue once they are gone
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _produce(self, queue: asyncio.Queue, requests: Iterator[Tuple[int, str]]):
+        for item in requests:
+            await queue.put(item)
+        for _ in range(self.concurrency):
+            await queue.put(None)
+    
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            line_number, line = item
+            self._write(await self._process(line_number, line))
+    
+    async def _process(self, line_number: int, line: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            request = ChatRequest.model_validate_json(line)
+            result = await self.app.process_request(
+                messages=request.messages,
+                conversation_id=request.conversation_id,
+                thread_id=request.thread_id,
+                session_id=request.session_id,
+                user_id=request.user_id,
+                delta=request.delta
+            )
+            response = ChatResponse(**result).model_dump(mode='json')
+            error = result['error_details'] if result['thread_status'] == THREAD_ERROR else None
+        except Exception as e:
+            logger.error(f"Line {line_number} failed: {str(e)}")
+            response, error = None, str(e)
+        
+        latency = time.perf_counter() - started
+        self.latencies.append(latency)
+        if error:
+            self.failed += 1
+        else:
+            self.succeeded += 1
+        return {
+            'line': line_number,
+            'latency_ms': round(latency * 1000),
+            'response': response,
+            'error': error
+        }
+    
+    def _write(self, record: Dict[str, Any]):
+        # One flushed line per result is the checkpoint
+        self.output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.output.flush()
+    
+    def summary(self, elapsed: float, skipped: int) -> str:
+        total = self.succeeded + self.failed
+        lines = [
+            f"Processed {total} requests in {elapsed:.1f}s "
+            f"({total / elapsed if elapsed else 0.0:.2f} req/s): "
+            f"{self.succeeded} ok, {self.failed} failed, {skipped} already done"
+        ]
+        if self.latencies:
+            ordered = sorted(self.latencies)
+            lines.append("Latency " + ", ".join(
+                [f"p{pct}={percentile(ordered, pct) * 1000:.0f}ms" for pct in PERCENTILES]
+                + [f"max={ordered[-1] * 1000:.0f}ms"]
+            ))
+        return "\n".join(lines)
+
+async def run_batch(input_path: str, output_path: str, concurrency: int, retry_errors: bool):
+    done = load_checkpoint(output_path, retry_errors)
+    if done:
+        print(f"Resuming: {len(done)} lines of {input_path} already in {output_path}", file=sys.stderr)
+    
+    app = AgenticAIApplication(factory=initialize_application())
+    http_client = get_http_client()
+    await http_client.start()
+    
+    started = time.perf_counter()
+    with open(output_path, 'a', encoding='utf-8') as output:
+        runner = BatchRunner(app, output, concurrency)
+        try:
+            await runner.run(read_requests(input_path, done))
+        finally:
+            print(runner.summary(time.perf_counter() - started, len(done)), file=sys.stderr)
+            await http_client.close()
+            await app.close()
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run a JSONL file of chat requests through the agent system")
+    parser.add_argument('input', help="JSONL file with one ChatRequest per line")
+    parser.add_argument('output', help="JSONL file to append results to (also the resume checkpoint)")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="Requests in flight at once")
+    parser.add_argument('--retry-errors', action='store_true', help="Rerun lines whose earlier result was an error")
+    parser.add_argument('--log-level', default='WARNING', help="Logging level for the agent system")
+    args = parser.parse_args(argv)
+    
+    load_environment()
+    configure_logging(level=args.log_level)
+    try:
+        asyncio.run(run_batch(args.input, args.output, args.concurrency, args.retry_errors))
+    except KeyboardInterrupt:
+        print("Interrupted - rerun the same command to resume", file=sys.stderr)
+        sys.exit(130)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""Load benchmarks for /chat against local stand-ins for OpenAI and the tool APIs
+
+    python -m benchmarks.run --requests 500 --concurrency 32
+"""
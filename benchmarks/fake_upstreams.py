@@ -0,0 +1,220 @@
+from typing import Dict, Any, List, Tuple, Optional
+from collections import Counter
+from datetime import date, timedelta
+import itertools
+import json
+import re
+import time
+from aiohttp import web
+from .latency import LatencyModel
+
+# Generous limits so the client-side rate limiter never throttles the benchmark
+RATE_LIMIT_HEADERS = {
+    'x-ratelimit-limit-requests': '1000000',
+    'x-ratelimit-remaining-requests': '999999',
+    'x-ratelimit-limit-tokens': '1000000000',
+    'x-ratelimit-remaining-tokens': '999999999'
+}
+
+CITY_PATTERN = re.compile(r'\bvisit(?:ing)? ([A-Z][\w-]*)')
+ANSWER_WORDS = 150
+PLACE_CATEGORIES = ['arts', 'food', 'landmarks']
+
+def _tool_call(call_id: str, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': call_id,
+        'type': 'function',
+        'function': {'name': name, 'arguments': json.dumps(arguments)}
+    }
+
+class ScriptedChat:
+    """Replays the triage -> trip planner flow a real model follows
+    
+    Triage hands off to the trip planner, which asks for weather and places in
+    parallel, then converts the place costs in bulk, then answers in text.
+    """
+    
+    def __init__(self):
+        self._ids = itertools.count()
+    
+    def reply(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the assistant message for a chat-completions request body"""
+        tools = {tool['function']['name'] for tool in body.get('tools') or []}
+        messages = body['messages']
+        last_user = max(i for i, message in enumerate(messages) if message['role'] == 'user')
+        user_text = messages[last_user].get('content') or ''
+        called = {message.get('name') for message in messages[last_user + 1:] if message['role'] == 'tool'}
+        
+        if body.get('tool_choice') != 'none':
+            if 'transfer_to_agent_trip_planner' in tools:
+                return self._calls([('transfer_to_agent_trip_planner', {})])
+            
+            if 'tool_weather_forecast' in tools and not called:
+                match = CITY_PATTERN.search(user_text)
+                city = match.group(1) if match else 'Paris'
+                start = date.today() + timedelta(days=1)
+                return self._calls([
+                    ('tool_weather_forecast', {
+                        'city': city,
+                        'start_date': start.isoformat(),
+                        'end_date': (start + timedelta(days=3)).isoformat()
+                    }),
+                    ('tool_places', {'city': city, 'categories': PLACE_CATEGORIES})
+                ])
+            
+            if 'tool_currency_bulk' in tools and 'tool_currency_bulk' not in called:
+                return self._calls([('tool_currency_bulk', {
+                    'amounts': [15, 30, 10, 25],
+                    'from_currency': 'EUR',
+                    'to_currency': 'USD'
+                })])
+        
+        words = (f"word{i % 50}" for i in range(ANSWER_WORDS))
+        return {'role': 'assistant', 'content': "Here is your itinerary: " + " ".join(words)}
+    
+    def _calls(self, calls: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        return {
+            'role': 'assistant',
+            'content': None,
+            'tool_calls': [_tool_call(f"call_{next(self._ids)}", name, arguments) for name, arguments in calls]
+        }
+
+class FakeUpstreams:
+    """Local HTTP stand-ins for OpenAI, WeatherAPI, Foursquare and ExchangeRate-API
+    
+    One aiohttp app is served on a separate port per upstream, so each one is
+    a distinct host to the app's connection pools, as in production.
+    """
+    
+    UPSTREAMS = ('openai', 'weather', 'foursquare', 'exchangerate')
+    
+    def __init__(self, llm_latency: LatencyModel, tool_latency: LatencyModel, host: str = '127.0.0.1'):
+        self.llm_latency = llm_latency
+        self.tool_latency = tool_latency
+        self.host = host
+        self.chat = ScriptedChat()
+        self.calls: Counter = Counter()
+        self.urls: Dict[str, str] = {}
+        self._runner: Optional[web.AppRunner] = None
+        
+        self.app = web.Application()
+        self.app.router.add_post('/v1/chat/completions', self._chat_completions)
+        self.app.router.add_get('/v1/forecast.json', self._forecast)
+        self.app.router.add_get('/v3/places/search', self._places)
+        self.app.router.add_get('/v6/{api_key}/latest/{base}', self._latest_rates)
+    
+    async def start(self) -> Dict[str, str]:
+        """Start serving and get each upstream's base URL"""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        for upstream in self.UPSTREAMS:
+            site = web.TCPSite(self._runner, self.host, 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            self.urls[upstream] = f"http://{self.host}:{port}"
+        return self.urls
+    
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+    
+    async def _chat_completions(self, request: web.Request) -> web.StreamResponse:
+        self.calls['openai'] += 1
+        body = await request.json()
+        await self.llm_latency.sleep()
+        
+        message = self.chat.reply(body)
+        prompt_tokens = len(await request.read()) // 4
+        completion_tokens = len(json.dumps(message)) // 4
+        usage = {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens
+        }
+        finish_reason = 'tool_calls' if message.get('tool_calls') else 'stop'
+        
+        if body.get('stream'):
+            return await self._stream(request, message, finish_reason, usage)
+        return web.json_response({
+            'id': f"chatcmpl-{self.calls['openai']}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body['model'],
+            'choices': [{'index': 0, 'finish_reason': finish_reason, 'message': message}],
+            'usage': usage
+        }, headers=RATE_LIMIT_HEADERS)
+    
+    async def _stream(self, request: web.Request, message: Dict[str, Any], finish_reason: str,
+                      usage: Dict[str, int]) -> web.StreamResponse:
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream', **RATE_LIMIT_HEADERS})
+        await response.prepare(request)
+        
+        base = {'id': f"chatcmpl-{self.calls['openai']}", 'object': 'chat.completion.chunk',
+                'created': int(time.time()), 'model': 'fake'}
+        
+        async def send(choices: List[Dict[str, Any]], **extra):
+            await response.write(f"data: {json.dumps({**base, 'choices': choices, **extra})}\n\n".encode())
+        
+        await send([{'index': 0, 'delta': {'role': 'assistant'}, 'finish_reason': None}])
+        if message.get('content'):
+            for word in message['content'].split(' '):
+                await send([{'index': 0, 'delta': {'content': word + ' '}, 'finish_reason': None}])
+        for index, call in enumerate(message.get('tool_calls') or []):
+            await send([{'index': 0, 'delta': {'tool_calls': [{**call, 'index': index}]}, 'finish_reason': None}])
+        await send([{'index': 0, 'delta': {}, 'finish_reason': finish_reason}])
+        await send([], usage=usage)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+    
+    async def _forecast(self, request: web.Request) -> web.Response:
+        self.calls['weather'] += 1
+        await self.tool_latency.sleep()
+        city = request.query.get('q', 'Paris')
+        days = int(request.query.get('days', 14))
+        today = date.today()
+        return web.json_response({
+            'location': {'name': city, 'country': 'Benchmarkland'},
+            'forecast': {'forecastday': [
+                {
+                    'date': (today + timedelta(days=i)).isoformat(),
+                    'day': {
+                        'condition': {'text': 'Partly cloudy'},
+                        'maxtemp_c': 18.4 + i % 5,
+                        'mintemp_c': 9.2 + i % 3,
+                        'daily_chance_of_rain': (i * 13) % 100
+                    }
+                }
+                for i in range(days)
+            ]}
+        })
+    
+    async def _places(self, request: web.Request) -> web.Response:
+        self.calls['foursquare'] += 1
+        await self.tool_latency.sleep()
+        city = request.query.get('near', 'Paris')
+        category = request.query.get('categories', '10000')
+        limit = int(request.query.get('limit', 10))
+        return web.json_response({'results': [
+            {
+                'fsq_id': f"{category}-{city}-{i}",
+                'name': f"{city} venue {category}-{i}",
+                'categories': [{'id': int(category), 'name': 'Venue'}],
+                'rating': round(9.5 - i * 0.3, 1),
+                'distance': 250 * (i + 1),
+                'location': {'formatted_address': f"{i + 1} Benchmark Street, {city}"}
+            }
+            for i in range(limit)
+        ]})
+    
+    async def _latest_rates(self, request: web.Request) -> web.Response:
+        self.calls['exchangerate'] += 1
+        await self.tool_latency.sleep()
+        return web.json_response({
+            'result': 'success',
+            'base_code': request.match_info['base'],
+            'conversion_rates': {
+                'USD': 1.0, 'EUR': 0.92, 'GBP': 0.79, 'JPY': 151.2, 'AUD': 1.52,
+                'CAD': 1.36, 'CHF': 0.9, 'CNY': 7.23, 'INR': 83.4
+            }
+        })
@@ -0,0 +1,36 @@
+from typing import Optional
+import asyncio
+import math
+import random
+
+# z-score of the 99th percentile of a standard normal distribution
+_Z_P99 = 2.3263
+
+class LatencyModel:
+    """Log-normal response time given its median and p99 in milliseconds"""
+    
+    def __init__(self, median_ms: float, p99_ms: Optional[float] = None):
+        self.median_ms = median_ms
+        self.p99_ms = max(p99_ms or median_ms, median_ms)
+        self._mu = math.log(median_ms) if median_ms > 0 else 0.0
+        self._sigma = math.log(self.p99_ms / median_ms) / _Z_P99 if median_ms > 0 else 0.0
+    
+    @classmethod
+    def parse(cls, spec: str) -> 'LatencyModel':
+        """Parse "median" or "median:p99" in milliseconds, e.g. "400:2500" """
+        median, _, p99 = spec.partition(':')
+        return cls(float(median), float(p99) if p99 else None)
+    
+    def sample(self) -> float:
+        """Draw one response time in seconds"""
+        if self.median_ms <= 0:
+            return 0.0
+        return random.lognormvariate(self._mu, self._sigma) / 1000
+    
+    async def sleep(self):
+        delay = self.sample()
+        if delay:
+            await asyncio.sleep(delay)
+    
+    def __str__(self) -> str:
+        return f"median {self.median_ms:.0f}ms, p99 {self.p99_ms:.0f}ms"
@@ -0,0 +1,251 @@
+"""Drive /chat under load against local fakes and report latency, throughput and memory
+
+    python -m benchmarks.run --requests 500 --concurrency 32 --llm-latency 400:2500
+
+The app runs in this process behind uvicorn, with OpenAI and the tool APIs
+pointed at FakeUpstreams. RSS covers the whole process (app, fakes and load
+generator); the fakes keep no state, so growth is the app's.
+"""
+from typing import Dict, Any, List, Optional
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import resource
+import sys
+import time
+import tracemalloc
+import aiohttp
+import uvicorn
+from .latency import LatencyModel
+from .fake_upstreams import FakeUpstreams
+
+logger = logging.getLogger(__name__)
+
+CITIES = ['Paris', 'Rome', 'Lisbon', 'Prague', 'Vienna', 'Berlin', 'Madrid', 'Amsterdam', 'Dublin', 'Athens']
+PERCENTILES = (50, 95, 99)
+
+def configure_environment(urls: Dict[str, str]):
+    """Point the app at the fakes - must run before the app is imported"""
+    os.environ['OPENAI_BASE_URL'] = f"{urls['openai']}/v1"
+    for key, value in {
+        'OPENAI_API_KEY': 'benchmark',
+        'OPENAI_MODEL': 'benchmark-model',
+        'OPENAI_REQUESTS_PER_MINUTE': '1000000',
+        'OPENAI_TOKENS_PER_MINUTE': '1000000000',
+        'WEATHERAPI_KEY': 'benchmark',
+        'FOURSQUARE_API_KEY': 'benchmark',
+        'EXCHANGERATE_API_KEY': 'benchmark',
+        'CONVERSATION_STORE': 'memory',
+        'LOG_LEVEL': 'WARNING'
+    }.items():
+        os.environ.setdefault(key, value)
+
+def point_tools_at(factory, urls: Dict[str, str]):
+    """Swap each tool service's upstream base URL for its fake"""
+    base_urls = {
+        'tool_weather_forecast': f"{urls['weather']}/v1/forecast.json",
+        'tool_places': f"{urls['foursquare']}/v3",
+        'tool_currency': f"{urls['exchangerate']}/v6",
+        'tool_currency_bulk': f"{urls['exchangerate']}/v6"
+    }
+    for name, base_url in base_urls.items():
+        if name in factory.tool_registry.available_tools:
+            factory.get_tool(name).service.base_url = base_url
+
+def city_name(index: int) -> str:
+    if index < len(CITIES):
+        return CITIES[index]
+    return f"Town{index}"
+
+def chat_request(index: int, cities: int) -> Dict[str, Any]:
+    city = city_name(index % cities)
+    return {
+        'messages': [{
+            'role': 'user',
+            'content': f"I'm planning to visit {city} next week for four days. I like museums and food "
+                       f"and I'm paying in USD. Can you help me plan my trip?"
+        }],
+        'conversation_id': f"bench-{index}",
+        'thread_id': 'main'
+    }
+
+def current_rss_mb() -> float:
+    """Resident set size now (Linux), else the peak so far"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def percentile(ordered: List[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+class LoadGenerator:
+    """Sends chat requests at fixed concurrency and records per-request timings"""
+    
+    def __init__(self, session: aiohttp.ClientSession, base_url: str, stream: bool, cities: int):
+        self.session = session
+        self.url = f"{base_url}/chat/stream" if stream else f"{base_url}/chat"
+        self.stream = stream
+        self.cities = cities
+        self.latencies: List[float] = []
+        self.first_tokens: List[float] = []
+        self.errors = 0
+    
+    async def run(self, start: int, count: int, concurrency: int):
+        indexes = iter(range(start, start + count))
+        
+        async def worker():
+            for index in indexes:
+                await self._send(index)
+        
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+    
+    async def _send(self, index: int):
+        started = time.perf_counter()
+        try:
+            async with self.session.post(self.url, json=chat_request(index, self.cities)) as response:
+                if self.stream:
+                    ok = await self._read_stream(response, started)
+                else:
+                    ok = response.status == 200 and (await response.json())['thread_status'] != 'error'
+        except aiohttp.ClientError as e:
+            logger.error(f"Request {index} failed: {str(e)}")
+            ok = False
+        
+        self.latencies.append(time.perf_counter() - started)
+        if not ok:
+            self.errors += 1
+    
+    async def _read_stream(self, response: aiohttp.ClientResponse, started: float) -> bool:
+        if response.status != 200:
+            return False
+        first_token, status = None, None
+        event = None
+        async for line in response.content:
+            line = line.decode().strip()
+            if line.startswith('event: '):
+                event = line[7:]
+                if event == 'token' and first_token is None:
+                    first_token = time.perf_counter() - started
+            elif line.startswith('data: ') and event == 'thread_status':
+                status = json.loads(line[6:]).get('thread_status')
+        if first_token is not None:
+            self.first_tokens.append(first_token)
+        return status not in (None, 'error')
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    summary = {f"p{pct}_ms": round(percentile(ordered, pct) * 1000, 1) for pct in PERCENTILES}
+    summary['max_ms'] = round(ordered[-1] * 1000, 1)
+    return summary
+
+async def run_benchmark(args) -> Dict[str, Any]:
+    upstreams = FakeUpstreams(LatencyModel.parse(args.llm_latency), LatencyModel.parse(args.tool_latency))
+    urls = await upstreams.start()
+    configure_environment(urls)
+    
+    # Imported here: the app reads its settings and builds its clients at import time
+    import api
+    point_tools_at(api.factory, urls)
+    
+    server = uvicorn.Server(uvicorn.Config(api.app, host='127.0.0.1', port=0, log_level='warning', lifespan='on'))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    
+    try:
+        connector = aiohttp.TCPConnector(limit=args.concurrency)
+        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=300)) as session:
+            base_url = f"http://127.0.0.1:{port}"
+            await LoadGenerator(session, base_url, args.stream, args.cities).run(0, args.warmup, args.concurrency)
+            
+            gc.collect()
+            rss_before = current_rss_mb()
+            if args.tracemalloc:
+                tracemalloc.start()
+            calls_before = dict(upstreams.calls)
+            
+            load = LoadGenerator(session, base_url, args.stream, args.cities)
+            started = time.perf_counter()
+            await load.run(args.warmup, args.requests, args.concurrency)
+            elapsed = time.perf_counter() - started
+            
+            gc.collect()
+            rss_after = current_rss_mb()
+            heap_growth = None
+            if args.tracemalloc:
+                heap_growth = tracemalloc.get_traced_memory()[0] / 2**20
+                tracemalloc.stop()
+    finally:
+        server.should_exit = True
+        await serving
+        await upstreams.stop()
+    
+    calls = {upstream: upstreams.calls[upstream] - calls_before.get(upstream, 0) for upstream in FakeUpstreams.UPSTREAMS}
+    report = {
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'stream': args.stream,
+        'llm_latency': str(upstreams.llm_latency),
+        'tool_latency': str(upstreams.tool_latency),
+        'errors': load.errors,
+        'elapsed_s': round(elapsed, 2),
+        'requests_per_s': round(args.requests / elapsed, 2),
+        'latency': latency_summary(load.latencies),
+        'llm_calls_per_request': round(calls['openai'] / args.requests, 2),
+        'upstream_calls_per_request': {
+            upstream: round(count / args.requests, 3) for upstream, count in calls.items() if upstream != 'openai'
+        },
+        'rss_mb': {'before': round(rss_before, 1), 'after': round(rss_after, 1), 'growth': round(rss_after - rss_before, 1)}
+    }
+    if args.stream:
+        report['first_token'] = latency_summary(load.first_tokens)
+    if heap_growth is not None:
+        report['python_heap_growth_mb'] = round(heap_growth, 2)
+    return report
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n{report['requests']} requests at concurrency {report['concurrency']}"
+          f"{' (streaming)' if report['stream'] else ''}")
+    print(f"  LLM latency {report['llm_latency']}; tool latency {report['tool_latency']}")
+    print(f"  Throughput:   {report['requests_per_s']} req/s over {report['elapsed_s']}s, {report['errors']} errors")
+    print(f"  Latency:      " + ", ".join(f"{key[:-3]}={value:.0f}ms" for key, value in report['latency'].items()))
+    if 'first_token' in report:
+        print(f"  First token:  " + ", ".join(f"{key[:-3]}={value:.0f}ms" for key, value in report['first_token'].items()))
+    print(f"  LLM calls:    {report['llm_calls_per_request']} per request")
+    print(f"  Tool calls:   " + ", ".join(f"{key}={value}" for key, value in report['upstream_calls_per_request'].items()) + " per request")
+    rss = report['rss_mb']
+    print(f"  RSS:          {rss['before']} -> {rss['after']} MB ({rss['growth']:+} MB)")
+    if 'python_heap_growth_mb' in report:
+        print(f"  Python heap:  {report['python_heap_growth_mb']:+} MB allocated and still live")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark /chat against local fake upstream APIs")
+    parser.add_argument('--requests', type=int, default=200, help="Measured requests")
+    parser.add_argument('--concurrency', type=int, default=16, help="Requests in flight at once")
+    parser.add_argument('--warmup', type=int, default=20, help="Unmeasured requests sent first")
+    parser.add_argument('--llm-latency', default='400:2000', help="OpenAI response time as median[:p99] ms")
+    parser.add_argument('--tool-latency', default='120:600', help="Tool API response time as median[:p99] ms")
+    parser.add_argument('--cities', type=int, default=10, help="Distinct cities across requests (cache hit ratio)")
+    parser.add_argument('--stream', action='store_true', help="Use /chat/stream and report time to first token")
+    parser.add_argument('--tracemalloc', action='store_true', help="Also trace Python heap growth (slower)")
+    parser.add_argument('--json', metavar='PATH', help="Write the report as JSON")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(run_benchmark(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if report['errors'] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,20 @@
-from core.base_agent import BaseAgent
-from core.base_tool import BaseTool
-from core.registry import Registry, AgentRegistry, ToolRegistry
-from core.application import Application
-from core.factory import AgentFactory
+import importlib
 
-__all__ = [
-    'BaseAgent',
-    'BaseTool',
-    'Registry',
-    'AgentRegistry',
-    'ToolRegistry',
-    'Application',
-    'AgentFactory'
-] 
\ No newline at end of file
+# Exports are resolved on first access so importing one core module
+# (core.messages, core.settings, ...) does not load the whole package
+_EXPORTS = {
+    'BaseAgent': 'core.base_agent',
+    'BaseTool': 'core.base_tool',
+    'Registry': 'core.registry',
+    'AgentRegistry': 'core.registry',
+    'ToolRegistry': 'core.registry',
+    'Application': 'core.application',
+    'AgentFactory': 'core.factory'
+}
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module 'core' has no attribute {name!r}")
+
+__all__ = list(_EXPORTS)
@@ -1,16 +1,30 @@
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional, Callable, Awaitable, Union
 from pydantic import BaseModel
 from .messages import Message
+from .message_buffer import MessageBuffer
+from .deadline import Deadline
+from .usage import RequestUsage
+from .metrics import AGENT_TURN_SECONDS, TOOL_EXECUTE_SECONDS, TOOL_ERRORS, TOOLS_IN_FLIGHT
 import json
 import logging
 import asyncio
+import time
 from .constants import (
-    ROLE_SYSTEM, ROLE_USER, ROLE_ASSISTANT, ROLE_TOOL
+    ROLE_SYSTEM, ROLE_ASSISTANT, ROLE_TOOL,
+    EVENT_TOOL_START, EVENT_TOOL_END, EVENT_TOKEN,
+    MAX_TOOL_ROUNDS, AGENT_PRIORITY_DEFAULT,
+    BUDGET_FINAL_ANSWER_TOKENS, BUDGET_FINAL_ANSWER_PROMPT,
+    FALLBACK_ANSWER_INTRO, FALLBACK_ANSWER_EMPTY, FALLBACK_RESULT_CHARS,
+    BUDGET_FALLBACK_INTRO, BUDGET_FALLBACK_EMPTY
 )
-from utils.logger import log_openai_exchange, log_openai_response
+from services.prompt_cache import CanonicalTools
+from utils.logger import log_openai_exchange, log_openai_response, structured, truncate
 
 logger = logging.getLogger(__name__)
 
+# Async callback receiving (event name, event data) for streaming clients
+EventCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
 class Agent(BaseModel):
     """Model for agent configuration"""
     name: str
@@ -24,7 +38,22 @@ class BaseAgent:
         self.name = name
         self.instructions = instructions
         self.functions = tools or []
-        self._agent = None
+        self.router = None  # Optional LocalRouter that can skip the LLM call
+        self.max_rounds = MAX_TOOL_ROUNDS
+        self.priority = AGENT_PRIORITY_DEFAULT
+    
+    @property
+    def functions(self) -> List[Any]:
+        return self._functions
+    
+    @functions.setter
+    def functions(self, tools: List[Any]):
+        """Set the agent's tools and index them by name for lookup"""
+        self._functions = tools or []
+        self._tool_index = {tool.name: tool for tool in self._functions}
+        self._agent = None  # Rebuild tool definitions on next use
+        self._tools = []
+        self.tool_tokens = 0
     
     def _initialize_agent(self):
         """Initialize the Agent model once we have all configuration"""
@@ -33,6 +62,9 @@ class BaseAgent:
             function_definitions = [
                 tool.get_tool_definition() for tool in self.functions
             ] if self.functions else []
+            # Canonicalized once per configuration; the schemas count against the token budget
+            self._tools = CanonicalTools(function_definitions)
+            self.tool_tokens = self._tools.estimated_tokens
             
             self._agent = Agent(
                 name=self.name,
@@ -42,57 +74,120 @@ class BaseAgent:
     
     @property
     def tools(self):
-        """Return tools in OpenAI format"""
+        """Return tools in OpenAI format, canonicalized for the prompt cache"""
         self._initialize_agent()  # Ensure agent is initialized
-        return self._agent.functions if self._agent else []
+        return self._tools if self._agent else []
 
-    async def process_message(self, messages: List[Message], client) -> Tuple[List[Message], bool, bool]:
-        """Process a message and handle any tool calls"""
-        logger.info(f"=== {self.name} processing message ===")
+    def _token_callback(self, on_event: Optional[EventCallback]):
+        """Forward streamed completion tokens as events, or None to disable streaming"""
+        if on_event is None:
+            return None
+        
+        async def on_token(token: str):
+            await on_event(EVENT_TOKEN, {"agent": self.name, "token": token})
+        return on_token
+
+    async def process_message(
+        self,
+        messages: Union[MessageBuffer, List[Message]],
+        client,
+        on_event: Optional[EventCallback] = None,
+        deadline: Optional[Deadline] = None,
+        usage: Optional[RequestUsage] = None
+    ) -> Tuple[MessageBuffer, bool, bool]:
+        """Process a message and handle any tool calls
+        
+        Runs at most max_rounds tool-calling rounds within the request deadline
+        and token budget; once any of them is spent the model is asked for a
+        final answer with tool_choice="none". Each completion's usage is added
+        to usage when given.
+        """
+        with AGENT_TURN_SECONDS.labels(self.name).time():
+            return await self._run_turn(messages, client, on_event, deadline, usage)
+    
+    async def _run_turn(
+        self,
+        messages: Union[MessageBuffer, List[Message]],
+        client,
+        on_event: Optional[EventCallback],
+        deadline: Optional[Deadline],
+        usage: Optional[RequestUsage]
+    ) -> Tuple[MessageBuffer, bool, bool]:
+        """One agent turn: the tool-calling loop, then a forced final answer if needed"""
+        logger.info("=== %s processing message ===", self.name, extra=structured('agent', agent=self.name))
         
         # Ensure agent is initialized
         self._initialize_agent()
         if not self._agent:
             raise ValueError(f"Agent {self.name} not properly configured - missing instructions")
         
-        # Add system message
-        current_messages = [
+        deadline = deadline or Deadline.for_request()
+        
+        # Add system message; history entries keep their serialized form
+        current_messages = MessageBuffer([
             Message(
                 role=ROLE_SYSTEM,
                 content=self.instructions
             )
-        ] + messages
+        ])
+        current_messages.extend(messages)
+        turn_start = len(current_messages)
         
         # Log OpenAI exchange
         log_openai_exchange(logger, self.name, current_messages, self.tools)
         
-        # Get response from OpenAI
-        completion = await client.chat(
-            messages=current_messages,
-            tools=self.tools
-        )
-        
-        assistant_message = Message(**completion.choices[0].message.model_dump())
-        log_openai_response(logger, self.name, assistant_message)
-        
-        # Handle tool calls if any
-        if assistant_message.tool_calls:
-            return await self._handle_tool_calls(assistant_message, current_messages, client)
+        rounds = 0
+        while rounds < self.max_rounds and not deadline.expired:
+            if usage and usage.nearly_exhausted(current_messages.estimated_tokens + self.tool_tokens):
+                break
+            
+            # Get response from OpenAI
+            try:
+                completion = await client.chat(
+                    messages=current_messages,
+                    tools=self.tools,
+                    on_token=self._token_callback(on_event),
+                    agent_name=self.name,
+                    timeout=deadline.remaining(),
+                    priority=self.priority
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"{self.name} completion hit the request deadline")
+                break
+            if usage:
+                usage.record(self.name, completion)
+            
+            assistant_message = Message(**completion.choices[0].message.model_dump())
+            log_openai_response(logger, self.name, assistant_message)
+            current_messages.append(assistant_message)
+            
+            # No tool calls, just return the conversation
+            if not assistant_message.tool_calls:
+                return current_messages.tail(1), False, False
+            
+            rounds += 1
+            await self._handle_tool_calls(assistant_message, current_messages, on_event, deadline)
+            
+            # A handoff ends this agent's turn - skip the extra completion
+            if any(
+                getattr(self._tool_index.get(tool_call.function.name), 'ends_turn', False)
+                for tool_call in assistant_message.tool_calls
+            ):
+                return current_messages.tail(1), False, False
         
-        # No tool calls, just return the conversation
-        current_messages.append(assistant_message)
-        return current_messages[1:], False, False
+        return await self._final_answer(current_messages, client, on_event, deadline, rounds, usage, turn_start)
 
-    async def _handle_tool_calls(self, assistant_message, current_messages, client) -> Tuple[List[Message], bool, bool]:
-        """Handle tool calls from OpenAI"""
-        current_messages.append(assistant_message)
-        
+    async def _handle_tool_calls(
+        self,
+        assistant_message: Message,
+        current_messages: MessageBuffer,
+        on_event: Optional[EventCallback],
+        deadline: Deadline
+    ):
+        """Run one round of tool calls and append their responses"""
         # Execute all tool calls in parallel
         tool_results = await asyncio.gather(*[
-            self.execute_tool(
-                tool_call.function.name,
-                **json.loads(tool_call.function.arguments)
-            )
+            self._run_tool_call(tool_call, on_event, deadline.remaining())
             for tool_call in assistant_message.tool_calls
         ], return_exceptions=True)
         
@@ -104,8 +199,10 @@ class BaseAgent:
                     "type": result.__class__.__name__
                 }
                 content = json.dumps(error_content)
+                result = error_content
             else:
-                content = json.dumps(result)
+                tool = self._tool_index.get(tool_call.function.name)
+                content = tool.format_result(result) if tool else json.dumps(result)
                 
             tool_response = Message(
                 role=ROLE_TOOL,
@@ -113,32 +210,135 @@ class BaseAgent:
                 name=tool_call.function.name,
                 content=content
             )
-            current_messages.append(tool_response)
+            current_messages.append(tool_response, result=result)
+
+    async def _final_answer(
+        self,
+        current_messages: MessageBuffer,
+        client,
+        on_event: Optional[EventCallback],
+        deadline: Deadline,
+        rounds: int,
+        usage: Optional[RequestUsage] = None,
+        turn_start: int = 0
+    ) -> Tuple[MessageBuffer, bool, bool]:
+        """Ask for a reply without further tool calls once the round, time or token budget is spent
+        
+        Near the token budget the answer is asked for without tool schemas and
+        with a capped length; if even that prompt does not fit, the tool results
+        gathered this turn are summarised without calling the model. If the call
+        fails or no time is left, the reply summarises those results too and the
+        turn reports a (non-server) error.
+        """
+        prompt, tools, max_tokens = current_messages, self.tools, None
+        if usage and usage.nearly_exhausted(current_messages.estimated_tokens + self.tool_tokens):
+            # The instruction only goes to the model; it is not kept in the history
+            prompt = MessageBuffer()
+            prompt.extend(current_messages)
+            prompt.append(Message(role=ROLE_SYSTEM, content=BUDGET_FINAL_ANSWER_PROMPT))
+            if usage.remaining < prompt.estimated_tokens + BUDGET_FINAL_ANSWER_TOKENS:
+                logger.warning(f"{self.name} token budget too low for a final answer after {rounds} tool rounds - replying with the results gathered so far")
+                fallback = Message(role=ROLE_ASSISTANT, content=self._fallback_answer(
+                    current_messages.tail(turn_start), BUDGET_FALLBACK_INTRO, BUDGET_FALLBACK_EMPTY
+                ))
+                current_messages.append(fallback)
+                return current_messages.tail(1), False, False
+            logger.warning(f"{self.name} near its token budget after {rounds} tool rounds - forcing a short final answer")
+            tools, max_tokens = None, BUDGET_FINAL_ANSWER_TOKENS
+        else:
+            logger.warning(f"{self.name} out of budget after {rounds} tool rounds - forcing a final answer")
+        
+        # Imported here so that importing agents does not pull in the OpenAI SDK
+        from openai import APIError
+        
+        try:
+            if deadline.final_remaining() <= 0:
+                raise asyncio.TimeoutError()
+            completion = await client.chat(
+                messages=prompt,
+                tools=tools,
+                tool_choice="none",
+                on_token=self._token_callback(on_event),
+                agent_name=self.name,
+                timeout=deadline.final_remaining(),
+                priority=self.priority,
+                max_tokens=max_tokens
+            )
+        except (asyncio.TimeoutError, APIError) as e:
+            logger.warning(f"{self.name} final answer failed ({e.__class__.__name__}) - replying with the results gathered so far")
+            fallback = Message(role=ROLE_ASSISTANT, content=self._fallback_answer(current_messages.tail(turn_start)))
+            current_messages.append(fallback)
+            return current_messages.tail(1), True, False
+        if usage:
+            usage.record(self.name, completion)
         
-        # Get final response
-        completion = await client.chat(
-            messages=current_messages,
-            tools=self.tools
+        # Keep only the text so the history never ends in unanswered tool calls
+        final_message = Message(
+            role=ROLE_ASSISTANT,
+            content=completion.choices[0].message.content or ""
         )
-        next_message = Message(**completion.choices[0].message.model_dump())
+        log_openai_response(logger, self.name, final_message)
+        current_messages.append(final_message)
+        return current_messages.tail(1), False, False
+
+    def _fallback_answer(
+        self,
+        turn_messages: MessageBuffer,
+        intro: str = FALLBACK_ANSWER_INTRO,
+        empty: str = FALLBACK_ANSWER_EMPTY
+    ) -> str:
+        """A reply quoting this turn's successful tool results, for when the model cannot answer"""
+        gathered = [
+            f"- {message.name}: {truncate(message.content or '', FALLBACK_RESULT_CHARS)}"
+            for message, result in turn_messages.tool_results()
+            if not (isinstance(result, dict) and result.get("error"))
+        ]
+        return "\n".join([intro, *gathered]) if gathered else empty
+
+    async def _run_tool_call(self, tool_call, on_event: Optional[EventCallback] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Execute one tool call within timeout seconds, reporting start and finish to the event stream"""
+        tool_name = tool_call.function.name
+        # The name comes from the model - only label metrics with the agent's own tools
+        label = tool_name if tool_name in self._tool_index else "unknown"
+        if on_event:
+            await on_event(EVENT_TOOL_START, {"agent": self.name, "tool": tool_name, "tool_call_id": tool_call.id})
         
-        # Check if OpenAI wants to make more tool calls
-        if next_message.tool_calls:
-            # Recursively handle the new tool calls
-            return await self._handle_tool_calls(next_message, current_messages, client)
-            
-        # No more tool calls, add final message and return
-        current_messages.append(next_message)
-        return current_messages[1:], False, False
+        TOOLS_IN_FLIGHT.labels(label).inc()
+        started = time.perf_counter()
+        error = None
+        try:
+            try:
+                result = await asyncio.wait_for(
+                    self.execute_tool(tool_name, **json.loads(tool_call.function.arguments)),
+                    timeout
+                )
+            except asyncio.TimeoutError:
+                raise asyncio.TimeoutError(f"{tool_name} did not finish before the request deadline")
+            if isinstance(result, dict) and result.get("error"):
+                error = str(result["error"])
+                TOOL_ERRORS.labels(label, result.get("type", "ToolError")).inc()
+            return result
+        except Exception as e:
+            error = str(e)
+            TOOL_ERRORS.labels(label, e.__class__.__name__).inc()
+            raise
+        finally:
+            TOOLS_IN_FLIGHT.labels(label).dec()
+            TOOL_EXECUTE_SECONDS.labels(label).observe(time.perf_counter() - started)
+            if on_event:
+                await on_event(EVENT_TOOL_END, {
+                    "agent": self.name,
+                    "tool": tool_name,
+                    "tool_call_id": tool_call.id,
+                    "duration_ms": round((time.perf_counter() - started) * 1000),
+                    "error": error
+                })
 
     async def execute_tool(self, tool_name: str, **kwargs) -> Dict[str, Any]:
         """Execute a tool - now handled directly in base class"""
-        logger.info("\n" + "▲" * 50)  # Added triangles
-        logger.info(f"{self.name} executing {tool_name}")
-        logger.info("▲" * 50)  # Added triangles
+        logger.info("%s executing %s", self.name, tool_name, extra=structured('tool', agent=self.name, tool=tool_name))
         
-        for tool in self.functions:
-            if tool.name == tool_name:
-                return await tool.execute(**kwargs)
-                
-        raise ValueError(f"Unknown tool: {tool_name}")
\ No newline at end of file
+        tool = self._tool_index.get(tool_name)
+        if tool is None:
+            raise ValueError(f"Unknown tool: {tool_name}")
+        return await tool.execute(**kwargs)
\ No newline at end of file
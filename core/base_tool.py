@@ -1,17 +1,36 @@
 from typing import Dict, Any
+import json
 import logging
+from core.compaction import CompactionStats, encode_compact
 
 logger = logging.getLogger(__name__)
 
 class BaseTool:
     """Base class for all tools"""
     
+    # Handoff tools end the agent loop once executed - the target agent answers instead
+    ends_turn = False
+    
     def __init__(self, name: str, description: str, schema: Dict[str, Any]):
         self.name = name
         self.description = description
         self.schema = schema
+        self.output = None  # Optional OutputProjection from the tool's 'output' config
+        self.policy = None  # Optional ToolPolicy from the tool's 'policy' config
+        self.service_loader = None  # Builds the service on first use for lazily loaded tools
+        self._service = None
         logger.debug(f"Initialized tool: {name}")
     
+    @property
+    def service(self) -> Any:
+        if self._service is None and self.service_loader is not None:
+            self._service = self.service_loader()
+        return self._service
+    
+    @service.setter
+    def service(self, value: Any):
+        self._service = value
+    
     def get_tool_definition(self) -> Dict[str, Any]:
         """Get tool definition in OpenAI format"""
         return {
@@ -24,6 +43,15 @@ class BaseTool:
             }
         }
     
+    def format_result(self, result: Any) -> str:
+        """Serialize a result for the LLM, compacted by the tool's output projection"""
+        if self.output is None:
+            return json.dumps(result)
+        
+        compacted = encode_compact(self.output.apply(result))
+        CompactionStats().record(self.name, json.dumps(result), compacted)
+        return compacted
+    
     async def execute(self, **kwargs) -> Dict[str, Any]:
         """Execute the tool - to be implemented by subclasses"""
         raise NotImplementedError("Subclasses must implement execute")
\ No newline at end of file
@@ -0,0 +1,213 @@
+from typing import Dict, Any, List, Optional, Callable
+from pathlib import Path
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_OFF = "off"
+CASSETTE_RECORD = "record"
+CASSETTE_REPLAY = "replay"
+
+KIND_CHAT = "chat"
+KIND_HTTP = "http"
+
+# Environment variables whose values never reach a cassette or a replay key
+_SECRET_ENV = re.compile(r'(KEY|TOKEN|SECRET)$')
+_SECRET_PARAMS = {'key', 'apikey', 'api_key', 'access_token', 'token'}
+_REDACTED = "<redacted>"
+
+class CassetteMiss(LookupError):
+    """No recorded response matches a replayed request"""
+
+class RecordedResponse:
+    """Stand-in for an aiohttp response, serving a recorded status and body"""
+    
+    def __init__(self, status: int, body: str, content_type: Optional[str] = None):
+        self.status = status
+        self.content_type = content_type
+        self._body = body
+    
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+    
+    async def json(self, **kwargs) -> Any:
+        return json.loads(self._body)
+    
+    async def text(self, **kwargs) -> str:
+        return self._body
+    
+    async def read(self) -> bytes:
+        return self._body.encode()
+    
+    async def __aenter__(self) -> 'RecordedResponse':
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        pass
+
+class _RecordingGet:
+    """Runs a real GET, records the response and hands back a replayable copy"""
+    
+    def __init__(self, cassette: 'Cassette', key: str, request):
+        self.cassette = cassette
+        self.key = key
+        self.request = request
+    
+    async def __aenter__(self) -> RecordedResponse:
+        started = time.perf_counter()
+        async with self.request as response:
+            body = await response.text()
+            recorded = RecordedResponse(response.status, body, response.content_type)
+        self.cassette.record(KIND_HTTP, self.key, {
+            'status': recorded.status,
+            'body': body,
+            'content_type': recorded.content_type
+        }, time.perf_counter() - started)
+        return recorded
+    
+    async def __aexit__(self, *exc_info):
+        pass
+
+class _ReplayingGet:
+    """Serves a recorded GET response after its (scaled) original latency"""
+    
+    def __init__(self, cassette: 'Cassette', key: str):
+        self.cassette = cassette
+        self.key = key
+    
+    async def __aenter__(self) -> RecordedResponse:
+        response = await self.cassette.replay(KIND_HTTP, self.key)
+        return RecordedResponse(response['status'], response['body'], response.get('content_type'))
+    
+    async def __aexit__(self, *exc_info):
+        pass
+
+class Cassette:
+    """On-disk record/replay store for LLM completions and tool HTTP responses
+    
+    Each exchange is one compact JSON line (gzip when the path ends in .gz)
+    keyed by a hash of the canonicalized request. Secrets are redacted before
+    hashing, so a cassette recorded with one set of credentials replays with
+    another. Replay serves each key's recorded responses round-robin, so
+    traffic captured once can be replayed any number of times and at a scaled
+    latency (latency_scale 0 replays as fast as possible).
+    """
+    
+    def __init__(self, path: str, mode: str, latency_scale: float = 1.0):
+        if mode not in (CASSETTE_RECORD, CASSETTE_REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._next: Dict[str, int] = {}
+        self._file = None
+        self._counts = {'recorded': 0, 'replayed': 0, 'missed': 0}
+        self._secrets = sorted(
+            (value for name, value in os.environ.items() if _SECRET_ENV.search(name) and len(value) >= 8),
+            key=len,
+            reverse=True
+        )
+        
+        if mode == CASSETTE_REPLAY:
+            self._load()
+        else:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._file = gzip.open(path, 'at', encoding='utf-8') if path.endswith('.gz') else open(path, 'a', encoding='utf-8')
+        logger.info(f"Cassette {mode} mode: {path}")
+    
+    @classmethod
+    def from_settings(cls, settings) -> Optional['Cassette']:
+        """Create the configured cassette, or None when record/replay is off"""
+        if settings.CASSETTE_MODE == CASSETTE_OFF:
+            return None
+        return cls(settings.CASSETTE_PATH, settings.CASSETTE_MODE, settings.CASSETTE_LATENCY_SCALE)
+    
+    @property
+    def replaying(self) -> bool:
+        return self.mode == CASSETTE_REPLAY
+    
+    def _load(self):
+        opener = gzip.open if self.path.endswith('.gz') else open
+        with opener(self.path, 'rt', encoding='utf-8') as f:
+            try:
+                for line in f:
+                    if line.endswith('\n'):
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry['key'], []).append(entry)
+            except EOFError:
+                # Recording was interrupted before close; every flushed line is complete
+                logger.warning(f"Cassette {self.path} is truncated, replaying the complete exchanges")
+        logger.info(f"Cassette loaded {sum(len(entries) for entries in self._entries.values())} exchanges from {self.path}")
+    
+    def redact(self, text: str) -> str:
+        for secret in self._secrets:
+            text = text.replace(secret, _REDACTED)
+        return text
+    
+    def key(self, kind: str, request: Dict[str, Any]) -> str:
+        """Hash a canonicalized request"""
+        canonical = json.dumps(request, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(f"{kind}:{self.redact(canonical)}".encode()).hexdigest()
+    
+    def record(self, kind: str, key: str, response: Dict[str, Any], latency: float):
+        entry = {'kind': kind, 'key': key, 'latency_ms': round(latency * 1000, 1), 'response': response}
+        self._file.write(self.redact(json.dumps(entry, separators=(',', ':'), ensure_ascii=False)) + '\n')
+        self._file.flush()
+        self._counts['recorded'] += 1
+    
+    async def replay(self, kind: str, key: str) -> Dict[str, Any]:
+        """Get the next recorded response for a request after its scaled latency"""
+        entries = self._entries.get(key)
+        if not entries:
+            self._counts['missed'] += 1
+            raise CassetteMiss(f"No recorded {kind} response for request {key[:12]}")
+        
+        index = self._next.get(key, 0)
+        self._next[key] = (index + 1) % len(entries)
+        entry = entries[index]
+        
+        delay = entry['latency_ms'] / 1000 * self.latency_scale
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._counts['replayed'] += 1
+        return entry['response']
+    
+    # Tool HTTP traffic (hooked into HttpClientPool.get)
+    
+    def http_get(self, send: Callable[[], Any], url: str, params: Optional[Dict[str, Any]] = None):
+        """Record or replay a GET issued through the shared connection pool
+        
+        send issues the real request and is only called when recording.
+        """
+        params = {
+            name: _REDACTED if name.lower() in _SECRET_PARAMS else str(value)
+            for name, value in (params or {}).items()
+        }
+        key = self.key(KIND_HTTP, {'method': 'GET', 'url': url, 'params': params})
+        if self.replaying:
+            return _ReplayingGet(self, key)
+        return _RecordingGet(self, key, send())
+    
+    # LLM traffic (hooked into OpenAIClient.chat)
+    
+    def chat_key(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]], tool_choice: Optional[str]) -> str:
+        """Key a completion by what the model sees (model name and streaming excluded)"""
+        return self.key(KIND_CHAT, {'messages': messages, 'tools': tools, 'tool_choice': tool_choice})
+    
+    def stats(self) -> Dict[str, Any]:
+        return {'mode': self.mode, 'path': self.path, **self._counts}
+    
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        logger.info(f"Cassette closed: {self._counts}")
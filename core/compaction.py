@@ -0,0 +1,122 @@
+from typing import Dict, Any, List, Optional
+import json
+import logging
+from utils.logger import structured
+
+logger = logging.getLogger(__name__)
+
+# Rough token estimate for JSON payloads (OpenAI tokenizers average ~4 chars/token)
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the prompt tokens a string will cost"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def encode_compact(result: Any) -> str:
+    """Serialize without whitespace or ASCII escaping"""
+    return json.dumps(result, separators=(',', ':'), ensure_ascii=False)
+
+class OutputProjection:
+    """Per-tool projection of results before they are fed back to the LLM
+    
+    Configured under 'output' for a tool in tools.yaml:
+        fields:  {<key>: [allowed fields]} for a dict or list of dicts under key,
+                 plus an optional '_' entry as the top-level allow-list
+        top_k:   {<key>: n} keep the first n items of the list under key, or
+                 {<key>: {limit: n, per: <field>}} keep the first n items per field value
+        round:   n digits for floats
+    """
+    
+    def __init__(self, fields: Dict[str, List[str]] = None, top_k: Dict[str, Any] = None,
+                 round_digits: Optional[int] = None):
+        self.fields = {key: set(allowed) for key, allowed in (fields or {}).items()}
+        self.top_k = top_k or {}
+        self.round_digits = round_digits
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'OutputProjection':
+        return cls(
+            fields=config.get('fields'),
+            top_k=config.get('top_k'),
+            round_digits=config.get('round')
+        )
+    
+    def apply(self, result: Any) -> Any:
+        """Get a projected copy of a tool result (the original is not modified)"""
+        if not isinstance(result, dict) or result.get("error"):
+            return result
+        
+        top_level = self.fields.get('_')
+        projected = {}
+        for key, value in result.items():
+            if top_level is not None and key not in top_level:
+                continue
+            if key in self.top_k and isinstance(value, list):
+                value = self._truncate(value, self.top_k[key])
+            if key in self.fields:
+                value = self._select(value, self.fields[key])
+            projected[key] = self._round(value)
+        return projected
+    
+    def _truncate(self, items: List[Any], top_k: Any) -> List[Any]:
+        """Keep the first items overall, or the first items per group"""
+        if not isinstance(top_k, dict):
+            return items[:top_k]
+        
+        limit, field = top_k['limit'], top_k['per']
+        counts: Dict[Any, int] = {}
+        kept = []
+        for item in items:
+            group = item.get(field) if isinstance(item, dict) else None
+            counts[group] = counts.get(group, 0) + 1
+            if counts[group] <= limit:
+                kept.append(item)
+        return kept
+    
+    def _select(self, value: Any, allowed: set) -> Any:
+        """Keep only allowed fields of a dict, or of each dict in a list"""
+        if isinstance(value, list):
+            return [self._select(item, allowed) for item in value]
+        if isinstance(value, dict):
+            return {key: item for key, item in value.items() if key in allowed}
+        return value
+    
+    def _round(self, value: Any) -> Any:
+        if self.round_digits is None:
+            return value
+        if isinstance(value, float):
+            return round(value, self.round_digits)
+        if isinstance(value, list):
+            return [self._round(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self._round(item) for key, item in value.items()}
+        return value
+
+class CompactionStats:
+    """Estimated prompt tokens per tool before and after compaction"""
+    _instance = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._tools = {}
+        return cls._instance
+    
+    def record(self, tool_name: str, before: str, after: str):
+        stats = self._tools.setdefault(tool_name, {'calls': 0, 'tokens_before': 0, 'tokens_after': 0})
+        stats['calls'] += 1
+        stats['tokens_before'] += estimate_tokens(before)
+        stats['tokens_after'] += estimate_tokens(after)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Compacted %s result: ~%d -> ~%d tokens", tool_name, estimate_tokens(before), estimate_tokens(after),
+                         extra=structured('tool', tool=tool_name))
+    
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-tool token totals and the share saved by compaction"""
+        return {
+            tool: {
+                **stats,
+                'saved': round(1 - stats['tokens_after'] / stats['tokens_before'], 4) if stats['tokens_before'] else 0.0
+            }
+            for tool, stats in self._tools.items()
+        }
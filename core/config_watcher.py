@@ -0,0 +1,76 @@
+from typing import Dict, Any, Optional
+from pathlib import Path
+import asyncio
+import logging
+import time
+from .manifest import ROOT_DIR, build_manifest, fingerprint
+
+logger = logging.getLogger(__name__)
+
+class ConfigWatcher:
+    """Hot reload of config/: polls its fingerprint and swaps in rebuilt registries when it changes
+    
+    The new manifest is built and validated off the event loop. The swap only
+    affects new requests; in-flight requests finish on the agents they started
+    with. A configuration that fails to validate or build is logged and
+    ignored until config/ changes again. Code under extensions/ is not
+    reloaded - that still needs a restart.
+    """
+    
+    def __init__(self, app: Any, interval: float, root: Path = ROOT_DIR):
+        self.app = app
+        self.interval = interval
+        self.root = root
+        self._fingerprint = fingerprint(root, include_code=False)
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {'reloads': 0, 'rejected': 0, 'last_reload_at': None, 'last_error': None}
+    
+    def start(self):
+        """Start polling (with interval 0, only explicit reload calls apply changes)"""
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._watch())
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.error(f"Config watcher check failed: {str(e)}")
+    
+    async def reload(self) -> bool:
+        """Rebuild and swap in the configuration if config/ changed since the last check"""
+        async with self._lock:
+            current = await asyncio.to_thread(fingerprint, self.root, False)
+            if current == self._fingerprint:
+                return False
+            self._fingerprint = current
+            
+            started = time.perf_counter()
+            try:
+                manifest = await asyncio.to_thread(build_manifest, self.root)
+                self.app.reload_config(manifest)
+            except Exception as e:
+                self._stats['rejected'] += 1
+                self._stats['last_error'] = str(e)
+                logger.error(f"Config reload rejected, keeping the current configuration: {str(e)}")
+                return False
+            
+            self._stats['reloads'] += 1
+            self._stats['last_reload_at'] = time.time()
+            self._stats['last_error'] = None
+            logger.info(f"Config reloaded in {(time.perf_counter() - started) * 1000:.1f}ms: agents {list(self.app.agents)}")
+            return True
+    
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, 'interval': self.interval, 'fingerprint': self._fingerprint[:12]}
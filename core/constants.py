@@ -14,4 +14,40 @@ THREAD_COMPLETE = "complete"
 THREAD_ERROR = "error"
 
 # Conversation limits
-MAX_CONVERSATION_HISTORY = 20
\ No newline at end of file
+MAX_CONVERSATION_HISTORY = 20
+
+# Agent loop
+MAX_TOOL_ROUNDS = 5  # Default tool-calling rounds per agent turn (override with max_rounds in agents.yaml)
+BUDGET_FINAL_ANSWER_TOKENS = 300  # Completion cap for the short answer given when a token budget runs out
+BUDGET_FINAL_ANSWER_PROMPT = "The token budget for this conversation is nearly used up. Answer briefly with what you already know."
+FALLBACK_ANSWER_INTRO = "I couldn't finish a full answer in time. Here is what I found so far:"
+FALLBACK_ANSWER_EMPTY = "I couldn't finish an answer in time. Please try again."
+FALLBACK_RESULT_CHARS = 500  # Per tool result quoted in the fallback answer
+BUDGET_FALLBACK_INTRO = "The token budget for this conversation is used up. Here is what I found so far:"
+BUDGET_FALLBACK_EMPTY = "The token budget for this conversation is used up. Please try again later."
+AGENT_PRIORITY_DEFAULT = 1  # LLM scheduling priority, lower runs first (override with priority in agents.yaml)
+
+# LLM call retries (rate limits, connection errors and 5xx)
+LLM_RETRY_BASE_DELAY = 0.5  # Seconds before the first retry, doubled each time
+LLM_RETRY_MAX_DELAY = 20  # Longest single wait between retries
+
+# HTTP client pool
+HTTP_POOL_LIMIT = 100  # Total open connections across all hosts
+HTTP_POOL_LIMIT_PER_HOST = 20  # Open connections per upstream API
+HTTP_DNS_CACHE_TTL = 300  # Seconds to cache DNS lookups
+HTTP_KEEPALIVE_TIMEOUT = 30  # Seconds to keep idle connections open
+
+# Tool call policies (see 'policy' in tools.yaml)
+LATENCY_WINDOW = 200  # Recent successful calls kept per tool for percentiles
+HEDGE_MIN_SAMPLES = 20  # Calls needed before p95 hedging kicks in
+
+# Prometheus histogram buckets in seconds (GET /metrics)
+TURN_LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)  # Agent turns and LLM calls
+TOOL_LATENCY_BUCKETS = (0.005, 0.025, 0.1, 0.25, 0.5, 1, 2, 4, 8)  # Tool executions, cache hits included
+
+# Streaming events (Server-Sent Events on /chat/stream)
+EVENT_ROUTING = "routing"
+EVENT_TOOL_START = "tool_start"
+EVENT_TOOL_END = "tool_end"
+EVENT_TOKEN = "token"
+EVENT_THREAD_STATUS = "thread_status"
@@ -0,0 +1,130 @@
+from typing import List, Optional
+from collections import OrderedDict
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import logging
+from .messages import Message
+
+logger = logging.getLogger(__name__)
+
+# Run the SQLite eviction query once every this many saves
+SQLITE_EVICTION_INTERVAL = 100
+
+def conversation_key(conversation_id: str, thread_id: Optional[str] = None) -> str:
+    """Key a stored conversation by conversation and thread"""
+    return f"{conversation_id}:{thread_id or ''}"
+
+def dump_messages(messages: List[Message]) -> str:
+    return json.dumps([message.model_dump(exclude_none=True) for message in messages], separators=(',', ':'))
+
+def load_messages(data: str) -> List[Message]:
+    return [Message(**message) for message in json.loads(data)]
+
+class ConversationStore:
+    """Base class for server-side conversation history backends"""
+    
+    async def load(self, key: str) -> List[Message]:
+        """Get the stored history for a conversation (empty if unknown)"""
+        raise NotImplementedError("Subclasses must implement load")
+    
+    async def save(self, key: str, messages: List[Message]):
+        """Replace the stored history for a conversation"""
+        raise NotImplementedError("Subclasses must implement save")
+    
+    async def close(self):
+        """Release backend resources"""
+        pass
+    
+    def after_fork(self):
+        """Reopen process-bound resources in a forked worker"""
+        pass
+
+class MemoryConversationStore(ConversationStore):
+    """In-process LRU store, evicting the least recently used conversations"""
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, List[Message]] = OrderedDict()
+    
+    async def load(self, key: str) -> List[Message]:
+        messages = self._entries.get(key)
+        if messages is None:
+            return []
+        self._entries.move_to_end(key)
+        return list(messages)
+    
+    async def save(self, key: str, messages: List[Message]):
+        self._entries[key] = list(messages)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+class SQLiteConversationStore(ConversationStore):
+    """SQLite-backed store - a local stand-in for a shared conversation store"""
+    
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._saves = 0
+        self._connect()
+        logger.info(f"Conversation store opened at {path}")
+    
+    def _connect(self):
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS conversations ("
+            "key TEXT PRIMARY KEY, messages TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS conversations_updated_at ON conversations (updated_at)")
+        self._db.commit()
+    
+    def after_fork(self):
+        # A SQLite connection must not be used across fork; the parent keeps its own
+        self._lock = threading.Lock()
+        self._connect()
+    
+    def _load(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT messages FROM conversations WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def _save(self, key: str, data: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO conversations (key, messages, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET messages = excluded.messages, updated_at = excluded.updated_at",
+                (key, data, time.time())
+            )
+            # Periodically evict the least recently updated conversations beyond max_entries
+            self._saves += 1
+            if self._saves % SQLITE_EVICTION_INTERVAL == 0:
+                self._db.execute(
+                    "DELETE FROM conversations WHERE key IN ("
+                    "SELECT key FROM conversations ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self._db.commit()
+    
+    async def load(self, key: str) -> List[Message]:
+        data = await asyncio.to_thread(self._load, key)
+        return load_messages(data) if data else []
+    
+    async def save(self, key: str, messages: List[Message]):
+        await asyncio.to_thread(self._save, key, dump_messages(messages))
+    
+    async def close(self):
+        with self._lock:
+            self._db.close()
+
+def create_conversation_store(backend: str, path: str, max_entries: int) -> ConversationStore:
+    """Create the configured conversation store backend ('memory' or 'sqlite')"""
+    if backend == "memory":
+        return MemoryConversationStore(max_entries)
+    if backend == "sqlite":
+        return SQLiteConversationStore(path, max_entries)
+    raise ValueError(f"Unknown conversation store backend: {backend}")
@@ -0,0 +1,32 @@
+from typing import Optional
+import time
+from .settings import get_settings
+
+class Deadline:
+    """Wall-clock budget for one request, shared by every LLM and tool call in it
+
+    The last reserve seconds are held back for the forced final answer, so a
+    turn that runs out of budget can still reply before the hard deadline.
+    """
+
+    def __init__(self, seconds: float, reserve: float = 0.0):
+        self.expires_at = time.monotonic() + seconds
+        self.reserve = min(reserve, seconds)
+
+    @classmethod
+    def for_request(cls, settings=None) -> 'Deadline':
+        """Create a deadline from the configured request budget"""
+        settings = settings or get_settings()
+        return cls(settings.REQUEST_DEADLINE_SECONDS, settings.FINAL_ANSWER_RESERVE_SECONDS)
+
+    def remaining(self) -> float:
+        """Seconds left for regular LLM and tool rounds"""
+        return max(0.0, self.expires_at - self.reserve - time.monotonic())
+
+    def final_remaining(self) -> float:
+        """Seconds left until the hard deadline, including the reserve"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
@@ -15,6 +15,7 @@ class AgentFactory:
             cls._instance = super().__new__(cls)
             cls._instance.agent_registry = AgentRegistry()
             cls._instance.tool_registry = ToolRegistry()
+            cls._instance.manifest = None  # Set once initialize_application has registered everything
             logger.debug("Initialized AgentFactory")
         return cls._instance
     
@@ -0,0 +1,75 @@
+from typing import TYPE_CHECKING
+import logging
+from .constants import (
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT
+)
+
+if TYPE_CHECKING:
+    import aiohttp
+
+logger = logging.getLogger(__name__)
+
+class HttpClientPool:
+    """Shared aiohttp connection pool for all tool services
+    
+    aiohttp is imported when the pool opens, so a process that has not made a
+    tool call yet has not paid for it.
+    """
+    _instance = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._session = None
+            cls._instance.cassette = None  # Optional Cassette recording or replaying tool traffic
+        return cls._instance
+    
+    def _open(self) -> 'aiohttp.ClientSession':
+        """Create the pooled session with per-host limits, DNS cache and keep-alive"""
+        import aiohttp
+        
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT
+        )
+        self._session = aiohttp.ClientSession(connector=connector)
+        logger.info(f"HTTP client pool opened (limit={HTTP_POOL_LIMIT}, per_host={HTTP_POOL_LIMIT_PER_HOST})")
+        return self._session
+    
+    @property
+    def is_open(self) -> bool:
+        return self._session is not None and not self._session.closed
+    
+    async def start(self):
+        """Open the pool - called on application startup"""
+        if not self.is_open:
+            self._open()
+    
+    async def close(self):
+        """Close the pool and release all connections - called on application shutdown"""
+        if self.is_open:
+            await self._session.close()
+            logger.info("HTTP client pool closed")
+        self._session = None
+    
+    @property
+    def session(self) -> 'aiohttp.ClientSession':
+        """Get the pooled session, opening it lazily outside the app lifecycle"""
+        if not self.is_open:
+            return self._open()
+        return self._session
+    
+    def get(self, url: str, **kwargs):
+        """Issue a GET request on the pooled session (or through the cassette)"""
+        if self.cassette is not None:
+            return self.cassette.http_get(lambda: self.session.get(url, **kwargs), url, kwargs.get('params'))
+        return self.session.get(url, **kwargs)
+
+def get_http_client() -> HttpClientPool:
+    """Get the shared HTTP client pool singleton"""
+    return HttpClientPool()
@@ -2,8 +2,8 @@ from core.registry import Registry
 from core.base_tool import BaseTool
 from core.base_agent import BaseAgent
 from core.factory import AgentFactory
-from utils.yaml_loader import load_yaml_config
-from pathlib import Path
+from core.manifest import load_manifest
+from typing import Dict, Any
 import logging
 import importlib
 
@@ -22,38 +22,32 @@ def get_class(class_path: str):
         logger.error(f"Error importing class {class_path}: {e}")
         raise
 
+def tool_class(tool_name: str, tool_info: Dict[str, Any]):
+    """Inner tools use BaseTool; triage tools name their class in the config"""
+    return BaseTool if tool_name.startswith('tool_') else get_class(tool_info['class'])
+
 def initialize_application():
-    """Initialize all registries and components from YAML configs"""
-    logger.info("Initializing application components")
+    """Register all components from the cached configuration manifest
     
-    # Get config directory
-    config_dir = Path(__file__).parent.parent / 'config'
-    
-    # Initialize factory
+    Idempotent: later calls return the already initialized factory. Tool
+    modules are not imported here - each is loaded on the tool's first use.
+    """
     factory = AgentFactory()
+    if factory.manifest is not None:
+        return factory
+    logger.info("Initializing application components")
     
-    # Load tool configurations
-    tools_config = load_yaml_config(config_dir / 'tools.yaml')
-    for tool_name, tool_info in tools_config['tools'].items():
-        # For inner tools, use BaseTool class
-        if tool_name.startswith('tool_'):
-            tool_class = get_class('core.base_tool.BaseTool')
-        else:
-            # For triage tools, get class from config
-            tool_class = get_class(tool_info['class'])
-            
+    manifest = load_manifest()
+    
+    for tool_name, tool_info in manifest['tools'].items():
         factory.tool_registry.register(
             tool_name,
-            tool_class,
+            tool_class(tool_name, tool_info),
             **tool_info
         )
     logger.info(f"Registered tools: {factory.tool_registry.available_tools}")
     
-    # Load agent configurations
-    agents_config = load_yaml_config(config_dir / 'agents.yaml')
-    for agent_name, agent_info in agents_config['agents'].items():
-        config = {k: v for k, v in agent_info.items() if k not in ['class', 'name']}
-        from core.base_agent import BaseAgent
+    for agent_name, config in manifest['agents'].items():
         factory.agent_registry.register(
             agent_name,
             BaseAgent,
@@ -61,7 +55,31 @@ def initialize_application():
         )
     logger.info(f"Registered agents: {factory.agent_registry.available_agents}")
     
+    factory.manifest = manifest
     return factory
 
+def reload_application(factory: AgentFactory, manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the components of a new manifest next to the live ones, then swap them in together
+    
+    Unchanged tools keep their live instances. If anything fails to build, the
+    error propagates and the live registries are left as they were. Returns
+    the new agents by name.
+    """
+    tool_items = {
+        tool_name: {'class': tool_class(tool_name, tool_info), 'config': tool_info}
+        for tool_name, tool_info in manifest['tools'].items()
+    }
+    agent_items = {
+        agent_name: {'class': BaseAgent, 'config': config}
+        for agent_name, config in manifest['agents'].items()
+    }
+    tools = factory.tool_registry.stage(tool_items)
+    agents = factory.agent_registry.stage(agent_items, tools)
+    
+    factory.tool_registry.swap(tool_items, tools)
+    factory.agent_registry.swap(agent_items, agents)
+    factory.manifest = manifest
+    return agents
+
 # Add __all__ to explicitly state what can be imported
-__all__ = ['initialize_application', 'get_class']
\ No newline at end of file
+__all__ = ['initialize_application', 'reload_application', 'get_class']
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import Set
 from dotenv import load_dotenv
 import os
 from pathlib import Path
@@ -5,6 +6,19 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# .env files already loaded by this process
+_loaded: Set[Path] = set()
+
+def load_env_file(env_path: Path):
+    """Load one .env file (if present) at most once per process"""
+    env_path = Path(env_path)
+    if env_path in _loaded:
+        return
+    _loaded.add(env_path)
+    if env_path.exists():
+        load_dotenv(env_path)
+        logger.debug(f"Loaded environment from {env_path}")
+
 def load_environment():
     """Load environment variables from all .env files"""
     # Get project root directory
@@ -13,16 +27,13 @@ def load_environment():
     # First load tool-specific .env files from extensions
     extensions_dir = root_dir / 'extensions'
     for tool_dir in extensions_dir.glob('tool_*'):
-        env_path = tool_dir / '.env'
-        if env_path.exists():
-            load_dotenv(env_path)
-            logger.debug(f"Loaded environment from {env_path}")
+        load_env_file(tool_dir / '.env')
     
     # Then load the main .env file (for OpenAI credentials)
     root_env_path = root_dir / '.env'
     if not root_env_path.exists():
         raise ValueError(f"Missing main .env file at {root_env_path}")
-    load_dotenv(root_env_path)
+    load_env_file(root_env_path)
     
     # Verify OpenAI environment variables
     if not os.getenv('OPENAI_API_KEY'):
@@ -0,0 +1,114 @@
+"""Validated, cached manifest of the tool and agent configuration
+
+    python -m core.manifest    # build the cache ahead of time, e.g. in the image build
+
+The manifest holds tools.yaml and agents.yaml after validation, with each
+tool's JSON schema resolved. It is cached as JSON and keyed by a fingerprint of
+the config directory and the extension sources, so a warm start registers every
+component without parsing YAML or importing any tool module.
+"""
+from typing import Dict, Any, Optional
+from pathlib import Path
+import hashlib
+import importlib
+import json
+import logging
+import os
+from utils.yaml_loader import load_yaml_config
+from .registry import to_pascal_case
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+ROOT_DIR = Path(__file__).parent.parent
+
+class ManifestError(ValueError):
+    """The tool or agent configuration is invalid"""
+
+def fingerprint(root: Path = ROOT_DIR, include_code: bool = True) -> str:
+    """Hash of everything the manifest is built from, or of config/ alone without include_code"""
+    digest = hashlib.sha256(f"manifest-v{MANIFEST_VERSION}".encode())
+    sources = sorted(path for path in (root / 'config').rglob('*') if path.is_file())
+    if include_code:
+        sources += sorted((root / 'extensions').glob('*/*.py'))
+    for path in sources:
+        digest.update(str(path.relative_to(root)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+def build_manifest(root: Path = ROOT_DIR, source_fingerprint: Optional[str] = None) -> Dict[str, Any]:
+    """Parse and validate the YAML configuration, importing each tool module once for its schema"""
+    tools_config = load_yaml_config(root / 'config' / 'tools.yaml')['tools']
+    agents_config = load_yaml_config(root / 'config' / 'agents.yaml')['agents']
+    
+    tools = {}
+    for name, info in tools_config.items():
+        if not info.get('description'):
+            raise ManifestError(f"Tool {name} has no description")
+        if name.startswith('tool_'):
+            pascal_name = to_pascal_case(name)
+            module = importlib.import_module(f"extensions.{name}")
+            for component in (f"{pascal_name}Service", f"{pascal_name}Schema"):
+                if not hasattr(module, component):
+                    raise ManifestError(f"Tool module extensions.{name} has no {component}")
+            tools[name] = {**info, 'schema': getattr(module, f"{pascal_name}Schema")}
+        elif info.get('class'):
+            tools[name] = info
+        else:
+            raise ManifestError(f"Tool {name} needs a 'class' (only tool_* tools are resolved by name)")
+    
+    agents = {}
+    for name, info in agents_config.items():
+        if not info.get('instructions'):
+            raise ManifestError(f"Agent {name} has no instructions")
+        unknown = [tool for tool in info.get('tools', []) if tool not in tools]
+        if unknown:
+            raise ManifestError(f"Agent {name} uses unregistered tools: {unknown}")
+        for key in ('max_rounds', 'priority'):
+            if key in info and not isinstance(info[key], int):
+                raise ManifestError(f"Agent {name} {key} must be an integer")
+        agents[name] = {key: value for key, value in info.items() if key not in ('class', 'name')}
+    
+    if 'agent_triage' not in agents:
+        raise ManifestError("Triage agent must be defined in configuration")
+    
+    return {
+        'version': MANIFEST_VERSION,
+        'fingerprint': source_fingerprint or fingerprint(root),
+        'tools': tools,
+        'agents': agents
+    }
+
+def load_manifest(cache_path: Optional[str] = None, root: Path = ROOT_DIR) -> Dict[str, Any]:
+    """Get the manifest from the cache, rebuilding and rewriting it when the sources changed"""
+    if cache_path is None:
+        from .settings import get_settings
+        cache_path = get_settings().MANIFEST_CACHE_PATH
+    
+    source_fingerprint = fingerprint(root)
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('fingerprint') == source_fingerprint:
+            logger.debug(f"Manifest loaded from {cache_path}")
+            return manifest
+    except (OSError, ValueError):
+        pass
+    
+    manifest = build_manifest(root, source_fingerprint)
+    try:
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        partial = f"{cache_path}.{os.getpid()}.tmp"
+        with open(partial, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        os.replace(partial, cache_path)
+        logger.info(f"Manifest rebuilt and cached at {cache_path}")
+    except OSError as e:
+        # Read-only filesystem: run uncached rather than fail
+        logger.warning(f"Could not cache manifest at {cache_path}: {str(e)}")
+    return manifest
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    manifest = load_manifest()
+    print(f"Manifest {manifest['fingerprint'][:12]}: {len(manifest['tools'])} tools, {len(manifest['agents'])} agents")
@@ -0,0 +1,105 @@
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, Union
+import json
+import logging
+from .messages import Message
+from .constants import ROLE_TOOL
+from .compaction import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Marks a tool message whose structured result has not been parsed yet
+_UNPARSED = object()
+
+class MessageBuffer:
+    """Append-only conversation history that serializes each message once
+    
+    Each entry keeps the Message, its request dict for the chat API and, for
+    tool messages, the structured result next to its JSON content. A multi-round
+    turn therefore only serializes what was appended since the previous call,
+    and callers read tool results without re-parsing the content.
+    """
+    
+    def __init__(self, messages: Iterable[Union[Message, Dict[str, Any]]] = ()):
+        self._messages: List[Message] = []
+        self._dicts: List[Dict[str, Any]] = []
+        self._results: List[Any] = []
+        self._tokens: List[int] = []
+        self.estimated_tokens = 0  # Running prompt token estimate for rate limiting
+        self.extend(messages)
+    
+    def append(self, message: Union[Message, Dict[str, Any]], result: Any = _UNPARSED):
+        """Add a message, with the structured result it was encoded from for tool messages"""
+        if not isinstance(message, Message):
+            message = Message(**message)
+        self._messages.append(message)
+        self._dicts.append(message.model_dump(exclude_none=True))
+        self._results.append(result)
+        
+        tokens = estimate_tokens(message.content or "") + sum(
+            estimate_tokens(tool_call.function.arguments) for tool_call in message.tool_calls or []
+        )
+        self._tokens.append(tokens)
+        self.estimated_tokens += tokens
+    
+    def extend(self, messages: Iterable[Union[Message, Dict[str, Any]]]):
+        if isinstance(messages, MessageBuffer):
+            # Share the other buffer's serialized entries instead of redoing them
+            self._messages.extend(messages._messages)
+            self._dicts.extend(messages._dicts)
+            self._results.extend(messages._results)
+            self._tokens.extend(messages._tokens)
+            self.estimated_tokens += messages.estimated_tokens
+            return
+        for message in messages:
+            self.append(message)
+    
+    def tail(self, start: int) -> 'MessageBuffer':
+        """Get a buffer of the entries from start on, sharing their serialized form"""
+        buffer = MessageBuffer()
+        buffer._messages = self._messages[start:]
+        buffer._dicts = self._dicts[start:]
+        buffer._results = self._results[start:]
+        buffer._tokens = self._tokens[start:]
+        buffer.estimated_tokens = sum(buffer._tokens)
+        return buffer
+    
+    def to_openai(self) -> List[Dict[str, Any]]:
+        """Get the messages in chat API request format"""
+        return list(self._dicts)
+    
+    @property
+    def messages(self) -> List[Message]:
+        return list(self._messages)
+    
+    def tool_result(self, index: int) -> Any:
+        """Get the structured result of a tool message, parsing its content at most once"""
+        result = self._results[index]
+        if result is _UNPARSED:
+            content = self._messages[index].content
+            try:
+                result = json.loads(content)
+            except (json.JSONDecodeError, TypeError):
+                logger.warning(f"Invalid tool response: {content}")
+                result = None
+            self._results[index] = result
+        return result
+    
+    def tool_results(self) -> List[Tuple[Message, Any]]:
+        """Get (message, structured result) for every tool message in order"""
+        return [
+            (message, self.tool_result(index))
+            for index, message in enumerate(self._messages)
+            if message.role == ROLE_TOOL
+        ]
+    
+    def __len__(self) -> int:
+        return len(self._messages)
+    
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self._messages)
+    
+    def __reversed__(self) -> Iterator[Message]:
+        return reversed(self._messages)
+    
+    def __getitem__(self, index):
+        return self._messages[index]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from typing import Optional, Dict, Any, List
 from core.constants import (
     ROLE_SYSTEM, ROLE_USER, ROLE_ASSISTANT, ROLE_TOOL
@@ -27,6 +27,13 @@ class ChatRequest(BaseModel):
     thread_id: Optional[str] = None
     session_id: Optional[str] = None
     user_id: Optional[str] = None
+    delta: bool = False  # messages holds only the new turn; history comes from the server-side store
+    
+    @model_validator(mode="after")
+    def check_delta(self):
+        if self.delta and not self.conversation_id:
+            raise ValueError("delta requests require a conversation_id")
+        return self
 
 class ChatResponse(BaseModel):
     result: str
@@ -35,4 +42,5 @@ class ChatResponse(BaseModel):
     session_id: Optional[str]
     thread_status: str
     messages: List[Message]
-    error_details: Optional[str] = None
\ No newline at end of file
+    error_details: Optional[str] = None
+    usage: Optional[Dict[str, Any]] = None  # Tokens and cost for this request, per agent and per round
\ No newline at end of file
@@ -0,0 +1,78 @@
+from prometheus_client import (
+    Counter, Gauge, Histogram, CollectorRegistry, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+import os
+from .constants import TURN_LATENCY_BUCKETS, TOOL_LATENCY_BUCKETS
+
+# Prometheus metrics served on GET /metrics. Label values are agent and tool
+# names from the YAML configuration, so cardinality stays bounded. Under
+# serve.py with several workers, PROMETHEUS_MULTIPROC_DIR is set and every
+# worker's samples are aggregated; in-flight gauges sum the live workers.
+
+REQUESTS_IN_FLIGHT = Gauge(
+    'agentic_requests_in_flight',
+    'Chat requests currently being processed',
+    multiprocess_mode='livesum'
+)
+THREAD_STATUS = Counter(
+    'agentic_thread_status_total',
+    'Finished chat requests by thread_status',
+    ['status']
+)
+ROUTING_DECISIONS = Counter(
+    'agentic_routing_decisions_total',
+    'Triage routing decisions by target and source (local router or LLM)',
+    ['target', 'source']
+)
+
+AGENT_TURN_SECONDS = Histogram(
+    'agentic_agent_turn_seconds',
+    'Agent turn duration, including its LLM calls and tool rounds',
+    ['agent'],
+    buckets=TURN_LATENCY_BUCKETS
+)
+
+LLM_REQUEST_SECONDS = Histogram(
+    'agentic_llm_request_seconds',
+    'client.chat duration, including rate-limit queueing and retries',
+    ['agent', 'outcome'],
+    buckets=TURN_LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter(
+    'agentic_llm_tokens_total',
+    'LLM tokens by agent and type (uncached prompt, cached prompt or completion)',
+    ['agent', 'type']
+)
+LLM_IN_FLIGHT = Gauge(
+    'agentic_llm_requests_in_flight',
+    'client.chat calls waiting for admission or a response',
+    multiprocess_mode='livesum'
+)
+
+TOOL_EXECUTE_SECONDS = Histogram(
+    'agentic_tool_execute_seconds',
+    'Tool execution duration, including cache hits, retries and hedging',
+    ['tool'],
+    buckets=TOOL_LATENCY_BUCKETS
+)
+TOOL_ERRORS = Counter(
+    'agentic_tool_errors_total',
+    'Tool calls that raised or returned an error, by error type',
+    ['tool', 'type']
+)
+TOOLS_IN_FLIGHT = Gauge(
+    'agentic_tool_executions_in_flight',
+    'Tool calls currently executing',
+    ['tool'],
+    multiprocess_mode='livesum'
+)
+
+def render_metrics() -> bytes:
+    """Current metrics in the Prometheus text exposition format, across workers when forked"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
@@ -1,7 +1,13 @@
-from typing import Dict, Type, Any
+from typing import Dict, Type, Any, Optional
 import logging
 import importlib
+import time
 from pathlib import Path
+from core.http_client import get_http_client
+from core.single_flight import SingleFlight, call_key
+from core.router import LocalRouter
+from core.compaction import OutputProjection
+from core.resilience import ToolPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +29,8 @@ class Registry:
             cls._instance = super().__new__(cls)
             cls._instance._items = {}
             cls._instance._configs = {}
+            cls._instance._instances = {}
+            cls._instance._inflight = SingleFlight()
         return cls._instance
     
     def register(self, name: str, item_class: Type, **kwargs):
@@ -32,13 +40,43 @@ class Registry:
             'class': item_class,
             'config': kwargs
         }
+        self._instances.pop(name, None)
     
     def get(self, name: str) -> Any:
-        """Get an instance of a registered component"""
-        if name not in self._items:
-            raise ValueError(f"{self._registry_type} not registered: {name}")
-            
-        item_info = self._items[name]
+        """Get the shared instance of a registered component, resolving it once per process"""
+        instance = self._instances.get(name)
+        if instance is None:
+            instance = self._create(name)
+            self._instances[name] = instance
+        return instance
+    
+    def stage(self, items: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the instances for a new set of registrations without touching the live ones
+        
+        A registration that did not change keeps its live instance, with its
+        loaded service, policy state and caches.
+        """
+        instances = {}
+        for name, item_info in items.items():
+            live = self._instances.get(name)
+            if live is not None and self._items.get(name) == item_info:
+                instances[name] = live
+            else:
+                logger.info(f"Building {self._registry_type}: {name}")
+                instances[name] = self._create(name, item_info)
+        return instances
+    
+    def swap(self, items: Dict[str, Dict[str, Any]], instances: Dict[str, Any]):
+        """Replace the registrations and their instances in one step"""
+        self._items, self._instances = items, instances
+    
+    def _create(self, name: str, item_info: Optional[Dict[str, Any]] = None, tools: Optional[Dict[str, Any]] = None) -> Any:
+        """Resolve and build a registered component (or the given registration, against staged tools)"""
+        if item_info is None:
+            if name not in self._items:
+                raise ValueError(f"{self._registry_type} not registered: {name}")
+            item_info = self._items[name]
+        
         cls = item_info['class']
         config = item_info['config']
         
@@ -52,24 +90,10 @@ class Registry:
         # Handle inner tools
         if name.startswith('tool_'):
             try:
-                # Convert tool name to class names
-                pascal_name = to_pascal_case(name)
-                
-                # Import the tool's module
-                module = importlib.import_module(f"extensions.{name}")
-                
-                try:
-                    # Get components using naming convention
-                    service_class = getattr(module, f"{pascal_name}Service")
-                    schema = getattr(module, f"{pascal_name}Schema")
-                except AttributeError as e:
-                    logger.error(f"""Failed to find required component for tool {name}:
-                        Looking for:
-                        - Service class: {pascal_name}Service
-                        - Schema constant: {pascal_name}Schema
-                        Error: {str(e)}
-                    """)
-                    raise
+                # The schema comes precompiled from the manifest; fall back to the module
+                schema = config.get('schema')
+                if schema is None:
+                    schema = getattr(importlib.import_module(f"extensions.{name}"), f"{to_pascal_case(name)}Schema")
                 
                 # Create tool instance
                 tool = cls(
@@ -77,15 +101,31 @@ class Registry:
                     description=config['description'],
                     schema=schema
                 )
+                if config.get('output'):
+                    tool.output = OutputProjection.from_config(config['output'])
+                if config.get('policy'):
+                    tool.policy = ToolPolicy.from_config(name, config['policy'])
                 
-                # Add service
-                tool.service = service_class()
+                # The tool module is imported and its service built on first use
+                tool.service_loader = lambda: self._load_service(name, config.get('service'))
                 
                 # Add execute method
+                inflight = self._inflight
+                
+                def call_service(kwargs):
+                    if tool.policy is None:
+                        return tool.service.execute(kwargs)
+                    # Timeouts, retries, hedging and the circuit breaker apply per upstream call
+                    return tool.policy.call(lambda: tool.service.execute(kwargs))
+                
                 async def execute(**kwargs):
                     try:
-                        # No Request class validation, pass kwargs directly
-                        return await tool.service.execute(kwargs)
+                        # No Request class validation, pass kwargs directly.
+                        # Identical concurrent calls share one upstream request.
+                        return await inflight.do(
+                            call_key(name, kwargs),
+                            lambda: call_service(kwargs)
+                        )
                     except Exception as e:
                         logger.error(f"Error executing {name}: {str(e)}")
                         raise
@@ -103,13 +143,39 @@ class Registry:
         # For BaseAgent
         if cls.__name__ == 'BaseAgent':
             instance = cls(name=name)
-            self._configure_instance(instance, config)
+            self._configure_instance(instance, config, tools)
             return instance
         
         # Default case - shouldn't reach here
         raise ValueError(f"Unknown component type: {cls.__name__}")
     
-    def _configure_instance(self, instance: Any, config: Dict[str, Any]):
+    def _load_service(self, name: str, settings: Optional[Dict[str, Any]] = None) -> Any:
+        """Import a tool's module and build its service with the shared connection pool
+        
+        settings come from the tool's 'service' entry in tools.yaml and override
+        the service's attributes of the same name.
+        """
+        started = time.perf_counter()
+        pascal_name = to_pascal_case(name)
+        module = importlib.import_module(f"extensions.{name}")
+        try:
+            service_class = getattr(module, f"{pascal_name}Service")
+        except AttributeError as e:
+            logger.error(f"Tool module extensions.{name} has no {pascal_name}Service: {str(e)}")
+            raise
+        
+        service = service_class()
+        if hasattr(service, 'http_client'):
+            service.http_client = get_http_client()
+        for key, value in (settings or {}).items():
+            if hasattr(service, key):
+                setattr(service, key, value)
+            else:
+                logger.warning(f"Ignoring unknown service setting for {name}: {key}")
+        logger.info(f"Loaded {name} service in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return service
+    
+    def _configure_instance(self, instance: Any, config: Dict[str, Any], tools: Optional[Dict[str, Any]] = None):
         """Configure instance with remaining parameters"""
         for key, value in config.items():
             if hasattr(instance, key):
@@ -132,23 +198,40 @@ class AgentRegistry(Registry):
         """Alias for get() to make code more readable"""
         return self.get(name)
     
-    def _configure_instance(self, instance: Any, config: Dict[str, Any]):
-        """Configure agent with instructions and tools"""
+    def stage(self, items: Dict[str, Dict[str, Any]], tools: Dict[str, Any]) -> Dict[str, Any]:
+        """Build every agent against the staged tools - agents are cheap and their routers read files"""
+        return {name: self._create(name, item_info, tools) for name, item_info in items.items()}
+    
+    def _configure_instance(self, instance: Any, config: Dict[str, Any], tools: Optional[Dict[str, Any]] = None):
+        """Configure agent with instructions and tools (staged tools if given, else the live registry)"""
         if 'instructions' in config:
             instance.instructions = config['instructions']
         
         if 'tools' in config:
-            tool_registry = ToolRegistry()
+            get_tool = tools.__getitem__ if tools is not None else ToolRegistry().get_tool
             instance.functions = [
-                tool_registry.get_tool(tool_name) 
+                get_tool(tool_name)
                 for tool_name in config['tools']
             ]
+        
+        if 'max_rounds' in config:
+            instance.max_rounds = config['max_rounds']
+        
+        if 'priority' in config:
+            instance.priority = config['priority']
+        
+        if 'router' in config:
+            router = LocalRouter.from_config(config['router'], Path(__file__).parent.parent)
+            unknown = [t for t in router.targets if t not in config.get('tools', [])]
+            if unknown:
+                raise ValueError(f"Router for {instance.name} targets tools it does not have: {unknown}")
+            instance.router = router
 
 class ToolRegistry(Registry):
     """Registry for tools"""
     _registry_type = "tool"
     
-    def _configure_instance(self, instance: Any, config: Dict[str, Any]):
+    def _configure_instance(self, instance: Any, config: Dict[str, Any], tools: Optional[Dict[str, Any]] = None):
         """Configure tool with its parameters"""
         for key, value in config.items():
             if hasattr(instance, key):
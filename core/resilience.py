@@ -0,0 +1,232 @@
+from typing import Dict, Any, Optional, Callable, Awaitable
+from collections import deque
+import asyncio
+import random
+import sys
+import time
+import logging
+from .constants import LATENCY_WINDOW, HEDGE_MIN_SAMPLES
+from utils.logger import structured
+
+logger = logging.getLogger(__name__)
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+def is_error_result(result: Any) -> bool:
+    """Tool services report failures as {"error": ...} results"""
+    return isinstance(result, dict) and bool(result.get("error"))
+
+def is_transient(error: BaseException) -> bool:
+    """Timeouts and connection failures may succeed on retry; anything else is bad input or a bug"""
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    # aiohttp is imported lazily, and none of its errors can exist before it is
+    aiohttp = sys.modules.get('aiohttp')
+    return aiohttp is not None and isinstance(error, aiohttp.ClientConnectionError)
+
+def status_error(message: str, status: int) -> Dict[str, Any]:
+    """Error result for an upstream HTTP status - only 429 and 5xx are worth retrying"""
+    return {"error": message, "retryable": status == 429 or status >= 500}
+
+def exception_error(error: Exception) -> Dict[str, Any]:
+    """Error result for an exception a service caught"""
+    return {"error": str(error), "retryable": is_transient(error)}
+
+class LatencyTracker:
+    """Rolling window of successful call durations"""
+    
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+    
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+    
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Get a latency percentile, or None until there are enough samples to trust it"""
+        if len(self._samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets one trial call through after reset seconds"""
+    
+    def __init__(self, failures: int, reset: float):
+        self.failure_threshold = failures
+        self.reset_seconds = reset
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+    
+    @property
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_seconds - time.monotonic())
+    
+    def allow(self) -> bool:
+        """Check whether a call may go upstream (claims the trial call when half-open)"""
+        if self.state == BREAKER_CLOSED:
+            return True
+        if self.state == BREAKER_OPEN and self.retry_after <= 0:
+            self.state = BREAKER_HALF_OPEN
+            return True
+        return False
+    
+    def record_success(self):
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+    
+    def record_failure(self):
+        self.failures += 1
+        if self.state == BREAKER_HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != BREAKER_OPEN:
+                logger.warning(f"Circuit breaker opened after {self.failures} failures")
+            self.state = BREAKER_OPEN
+            self.opened_at = time.monotonic()
+    
+    def release(self):
+        """Give up a cancelled trial call so the next caller can claim it"""
+        if self.state == BREAKER_HALF_OPEN:
+            self.state = BREAKER_OPEN
+
+class ToolPolicy:
+    """Timeout, retry, hedging and circuit-breaker policy for one tool
+    
+    Configured under 'policy' for a tool in tools.yaml:
+        timeout:  seconds per attempt
+        retries:  extra attempts after a failed one
+        backoff:  seconds before the first retry, doubled (with jitter) each time
+        hedge:    start a second attempt once a call runs past the tool's p95 latency
+        breaker:  {failures: n, reset: seconds} - open after n consecutive failures
+    
+    Only transient failures are retried and counted by the breaker: timeouts,
+    connection errors and {"error": ..., "retryable": true} results (upstream
+    429 or 5xx). Other errors - an unknown city, an unsupported currency, a
+    request over a tool's limits - go straight back to the model, so one
+    user's bad input cannot open the circuit for everyone. Retries and hedges
+    re-run the call, so only use them for idempotent tools.
+    """
+    
+    def __init__(self, name: str, timeout: Optional[float] = None, retries: int = 0,
+                 backoff: float = 0.2, hedge: bool = False, breaker: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge = hedge
+        self.breaker = CircuitBreaker(breaker['failures'], breaker['reset']) if breaker else None
+        self.latency = LatencyTracker()
+        self._counts = {'calls': 0, 'failures': 0, 'retries': 0, 'hedges': 0, 'rejected': 0}
+    
+    @classmethod
+    def from_config(cls, name: str, config: Dict[str, Any]) -> 'ToolPolicy':
+        return cls(
+            name=name,
+            timeout=config.get('timeout'),
+            retries=config.get('retries', 0),
+            backoff=config.get('backoff', 0.2),
+            hedge=config.get('hedge', False),
+            breaker=config.get('breaker')
+        )
+    
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn under the policy, returning a structured error while the breaker is open"""
+        self._counts['calls'] += 1
+        attempt = 0
+        while True:
+            if self.breaker and not self.breaker.allow():
+                self._counts['rejected'] += 1
+                logger.warning(f"{self.name} circuit open - failing fast")
+                return {
+                    "error": f"{self.name} is temporarily unavailable, try again later or continue without it",
+                    "type": "CircuitOpen",
+                    "retry_after": round(self.breaker.retry_after, 1)
+                }
+            
+            error, result = None, None
+            try:
+                result = await self._attempt(fn)
+            except asyncio.CancelledError:
+                if self.breaker:
+                    self.breaker.release()
+                raise
+            except Exception as e:
+                error = e
+            
+            if error is None and not is_error_result(result):
+                if self.breaker:
+                    self.breaker.record_success()
+                return result
+            
+            self._counts['failures'] += 1
+            transient = is_transient(error) if error is not None else bool(result.get("retryable"))
+            if self.breaker:
+                if transient:
+                    self.breaker.record_failure()
+                else:
+                    # The upstream answered; hand back a trial call without judging it
+                    self.breaker.release()
+            if not transient or attempt >= self.retries:
+                if error is not None:
+                    raise error
+                return result
+            
+            attempt += 1
+            self._counts['retries'] += 1
+            delay = self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            logger.info("Retrying %s in %.2fs (attempt %d)", self.name, delay, attempt + 1, extra=structured('tool', tool=self.name))
+            await asyncio.sleep(delay)
+    
+    async def _attempt(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one attempt within the timeout, hedged once it outlives the p95 latency"""
+        started = time.perf_counter()
+        hedge_after = self.latency.percentile(0.95) if self.hedge else None
+        call = self._hedged(fn, hedge_after) if hedge_after is not None else fn()
+        try:
+            result = await asyncio.wait_for(call, self.timeout)
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(f"{self.name} timed out after {self.timeout}s")
+        
+        if not is_error_result(result):
+            self.latency.record(time.perf_counter() - started)
+        return result
+    
+    async def _hedged(self, fn: Callable[[], Awaitable[Any]], hedge_after: float) -> Any:
+        """Start a second request if the first is slower than usual and take the first success"""
+        first = asyncio.ensure_future(fn())
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if done:
+                return first.result()
+            
+            self._counts['hedges'] += 1
+            logger.info("Hedging %s after %.0fms", self.name, hedge_after * 1000, extra=structured('tool', tool=self.name))
+            tasks.append(asyncio.ensure_future(fn()))
+            
+            pending, finished = set(tasks), []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    if task.exception() is None and not is_error_result(task.result()):
+                        return task.result()
+                    finished.append(task)
+            if not finished:
+                raise asyncio.CancelledError()
+            return finished[-1].result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get call counts, p95 latency and breaker state"""
+        p95 = self.latency.percentile(0.95)
+        return {
+            **self._counts,
+            'p95_ms': round(p95 * 1000) if p95 is not None else None,
+            'breaker': self.breaker.state if self.breaker else None
+        }
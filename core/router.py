@@ -0,0 +1,151 @@
+from typing import Dict, Any, List, Optional
+from pathlib import Path
+import json
+import math
+import re
+import logging
+from .messages import Message
+from .constants import ROLE_USER
+from utils.logger import structured
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+class RouterRule:
+    """Keyword/regex rule that scores a message for one routing target"""
+    
+    def __init__(self, target: str, keywords: List[str] = None, patterns: List[str] = None,
+                 keyword_weight: float = 1.0, pattern_weight: float = 2.0):
+        self.target = target
+        self.keyword_weight = keyword_weight
+        self.pattern_weight = pattern_weight
+        self.keywords = re.compile(
+            r"\b(?:" + "|".join(re.escape(k.lower()) for k in keywords) + r")\b"
+        ) if keywords else None
+        self.patterns = [re.compile(p, re.IGNORECASE) for p in patterns or []]
+    
+    def score(self, text: str) -> float:
+        """Score lowercased text: distinct keyword hits plus matching patterns"""
+        score = 0.0
+        if self.keywords:
+            score += self.keyword_weight * len(set(self.keywords.findall(text)))
+        for pattern in self.patterns:
+            if pattern.search(text):
+                score += self.pattern_weight
+        return score
+
+class LinearClassifier:
+    """Small bag-of-words linear classifier loaded from a trained JSON file
+    
+    File format: {"targets": {"<tool name>": {"bias": float, "weights": {"<token>": float}}}}
+    """
+    
+    def __init__(self, targets: Dict[str, Dict[str, Any]]):
+        self.targets = {
+            target: (model.get('bias', 0.0), model.get('weights', {}))
+            for target, model in targets.items()
+        }
+    
+    @classmethod
+    def load(cls, path: Path) -> 'LinearClassifier':
+        with open(path, 'r') as f:
+            return cls(json.load(f)['targets'])
+    
+    def predict(self, text: str) -> Dict[str, float]:
+        """Get softmax probabilities per target"""
+        tokens = TOKEN_PATTERN.findall(text)
+        logits = {
+            target: bias + sum(weights.get(token, 0.0) for token in tokens)
+            for target, (bias, weights) in self.targets.items()
+        }
+        top = max(logits.values())
+        exps = {target: math.exp(logit - top) for target, logit in logits.items()}
+        total = sum(exps.values())
+        return {target: value / total for target, value in exps.items()}
+
+class LocalRouter:
+    """Deterministic router that picks a transfer tool without a triage LLM call
+    
+    Returns a target only when confident; otherwise the caller falls back to
+    LLM triage. Hit/miss counts show how many triage calls are saved.
+    """
+    
+    def __init__(self, rules: List[RouterRule] = None, min_score: float = 2.0, min_margin: float = 1.0,
+                 classifier: Optional[LinearClassifier] = None, min_probability: float = 0.9):
+        self.rules = rules or []
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.classifier = classifier
+        self.min_probability = min_probability
+        self.hits = 0
+        self.misses = 0
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], base_dir: Path) -> 'LocalRouter':
+        """Build a router from the 'router' block of an agent in agents.yaml"""
+        classifier = None
+        if config.get('classifier'):
+            classifier = LinearClassifier.load(base_dir / config['classifier'])
+        return cls(
+            rules=[RouterRule(**rule) for rule in config.get('rules', [])],
+            min_score=config.get('min_score', 2.0),
+            min_margin=config.get('min_margin', 1.0),
+            classifier=classifier,
+            min_probability=config.get('min_probability', 0.9)
+        )
+    
+    @property
+    def targets(self) -> List[str]:
+        targets = [rule.target for rule in self.rules]
+        if self.classifier:
+            targets.extend(self.classifier.targets)
+        return targets
+    
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hit_rate, 4)
+        }
+    
+    def route(self, messages: List[Message]) -> Optional[str]:
+        """Get the transfer tool for the latest user message, or None when unsure"""
+        text = next(
+            (msg.content for msg in reversed(messages) if msg.role == ROLE_USER and msg.content),
+            ""
+        ).lower()
+        
+        target = self._route_rules(text) if text else None
+        if target is None and text and self.classifier:
+            target = self._route_classifier(text)
+        
+        if target:
+            self.hits += 1
+        else:
+            self.misses += 1
+        logger.info("Local router %s (hit rate %.0f%% over %d requests)", f"hit: {target}" if target else "miss",
+                    self.hit_rate * 100, self.hits + self.misses, extra=structured('routing', target=target))
+        return target
+    
+    def _route_rules(self, text: str) -> Optional[str]:
+        """Pick the best-scoring rule if it clears min_score and beats the runner-up by min_margin"""
+        if not self.rules:
+            return None
+        scores = sorted(((rule.score(text), rule.target) for rule in self.rules), reverse=True)
+        best_score, best_target = scores[0]
+        runner_up = scores[1][0] if len(scores) > 1 else 0.0
+        if best_score >= self.min_score and best_score - runner_up >= self.min_margin:
+            return best_target
+        return None
+    
+    def _route_classifier(self, text: str) -> Optional[str]:
+        """Pick the classifier's top target if its probability clears min_probability"""
+        probabilities = self.classifier.predict(text)
+        target, probability = max(probabilities.items(), key=lambda item: item[1])
+        return target if probability >= self.min_probability else None
@@ -1,3 +1,4 @@
+from typing import Dict
 from pydantic_settings import BaseSettings
 from pathlib import Path
 
@@ -11,6 +12,50 @@ class Settings(BaseSettings):
     OPENAI_MAX_TOKENS: int = 1000
     OPENAI_ORG_ID: str | None = None
     
+    # Client-side OpenAI rate limiting (match your account tier)
+    OPENAI_MAX_CONCURRENCY: int = 16
+    OPENAI_REQUESTS_PER_MINUTE: int = 500
+    OPENAI_TOKENS_PER_MINUTE: int = 200000
+    OPENAI_MAX_RETRIES: int = 4
+    
+    # Pricing for usage accounting, USD per million tokens
+    OPENAI_INPUT_COST_PER_1M: float = 0.15
+    OPENAI_CACHED_INPUT_COST_PER_1M: float = 0.075
+    OPENAI_OUTPUT_COST_PER_1M: float = 0.60
+    
+    # Token budgets (0 = unlimited); a request near its budget gets a short final answer
+    CONVERSATION_TOKEN_BUDGET: int = 0
+    USER_DAILY_TOKEN_BUDGET: int = 0
+    
+    # Per-request wall-clock budget; the reserve is kept for a forced final answer
+    REQUEST_DEADLINE_SECONDS: float = 60.0
+    FINAL_ANSWER_RESERVE_SECONDS: float = 10.0
+    
+    # Logging: records are formatted and written by a listener thread, off the event loop
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"  # "text" or "json" (one object per record with its structured fields)
+    LOG_QUEUE_SIZE: int = 10000  # Records beyond this are dropped rather than blocking requests
+    LOG_MAX_MESSAGE_CHARS: int = 2000  # Longer messages and string fields are truncated (0 = no limit)
+    LOG_SAMPLE_RATES: Dict[str, float] = {}  # Fraction of INFO/DEBUG records kept per category, e.g. {"exchange": 0.1}
+    
+    # Traffic cassette: "record" LLM and tool responses to CASSETTE_PATH, or "replay" them
+    CASSETTE_MODE: str = "off"  # "off", "record" or "replay"
+    CASSETTE_PATH: str = str(Path(__file__).parent.parent / 'cassettes' / 'traffic.jsonl.gz')
+    CASSETTE_LATENCY_SCALE: float = 1.0  # Replay delay as a multiple of the recorded latency (0 = none)
+    
+    # Validated tool/agent manifest, rebuilt whenever config/ or extensions/ change
+    MANIFEST_CACHE_PATH: str = str(Path(__file__).parent.parent / '.cache' / 'manifest.json')
+    CONFIG_WATCH_INTERVAL: float = 5.0  # Seconds between checks of config/ for hot reload (0 = off)
+    
+    # Production server (serve.py): pre-forked workers sharing one listening socket
+    WEB_WORKERS: int = 0  # 0 = one per CPU
+    WEB_GRACEFUL_TIMEOUT: float = 65.0  # Drain time on shutdown; above REQUEST_DEADLINE_SECONDS so started conversations finish
+    
+    # Conversation store settings
+    CONVERSATION_STORE: str = "memory"  # "memory" (LRU) or "sqlite"
+    CONVERSATION_STORE_PATH: str = str(Path(__file__).parent.parent / 'conversations.db')
+    CONVERSATION_STORE_MAX_ENTRIES: int = 10000
+    
     class Config:
         env_file = str(Path(__file__).parent.parent / '.env')
         env_file_encoding = 'utf-8'
@@ -0,0 +1,59 @@
+from typing import Dict, Any, Callable, Awaitable
+import asyncio
+import json
+import logging
+from utils.logger import structured
+
+logger = logging.getLogger(__name__)
+
+def call_key(name: str, arguments: Dict[str, Any]) -> str:
+    """Canonical key for a tool call: tool name plus sorted, compact JSON arguments"""
+    return f"{name}:{json.dumps(arguments, sort_keys=True, separators=(',', ':'), default=str)}"
+
+class _Call:
+    """One in-flight upstream call and the number of callers waiting on it"""
+    __slots__ = ('task', 'waiters')
+    
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """Coalesce concurrent identical calls so they share one upstream request"""
+    
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+    
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn once for all concurrent callers with the same key
+        
+        The result (or exception) is shared with every waiter. A caller that is
+        cancelled only stops waiting; the shared call is cancelled once no
+        caller is left waiting for it.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _, key=key, call=call: self._forget(key, call))
+        else:
+            logger.debug("Coalescing in-flight call: %s", key, extra=structured('cache'))
+        
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every caller gave up - nobody needs the upstream result any more
+                call.task.cancel()
+                self._forget(key, call)
+    
+    def _forget(self, key: str, call: _Call):
+        """Drop a finished call so the next caller starts a fresh request"""
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,91 @@
+"""Where cold start time goes: startup phases of this process and a per-package import breakdown
+
+    python -m core.startup --top 15
+
+Import this module first in an entry point; phases are measured from then.
+"""
+from typing import Dict, Any, List, Optional
+from collections import Counter
+from pathlib import Path
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+_IMPORTED_AT = time.perf_counter()
+
+def _process_age_ms() -> Optional[float]:
+    """Milliseconds since this process was started, interpreter start-up included (Linux only)"""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return round((uptime - start_ticks / os.sysconf('SC_CLK_TCK')) * 1000, 1)
+    except (OSError, ValueError, IndexError):
+        return None
+
+class StartupTimer:
+    """Wall-clock phases of process startup, shared process-wide"""
+    _instance = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._last = _IMPORTED_AT
+            cls._instance._phases = {}
+        return cls._instance
+    
+    def mark(self, phase: str):
+        """Record the time since the previous mark (or this module's import) as phase"""
+        now = time.perf_counter()
+        self._phases[phase] = round((now - self._last) * 1000, 1)
+        self._last = now
+    
+    def report(self) -> Dict[str, Any]:
+        return {
+            'phases_ms': dict(self._phases),
+            'total_ms': round(sum(self._phases.values()), 1),
+            'process_age_ms': _process_age_ms()
+        }
+
+def import_breakdown(module: str = 'api', cwd: Path = Path(__file__).parent.parent) -> Dict[str, Any]:
+    """Import module in a fresh interpreter under -X importtime; self time per top-level package"""
+    code = f"import json, {module}; from core.startup import StartupTimer; print(json.dumps(StartupTimer().report()))"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=cwd, capture_output=True, text=True, check=True
+    )
+    packages: Counter = Counter()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(self_us)
+    return {
+        'startup': json.loads(result.stdout.strip().splitlines()[-1]),
+        'imports_ms': {package: round(us / 1000, 1) for package, us in packages.most_common()}
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Report cold start time by phase and by imported package")
+    parser.add_argument('--module', default='api', help="Entry module to import")
+    parser.add_argument('--top', type=int, default=15, help="Packages to list")
+    args = parser.parse_args(argv)
+    
+    breakdown = import_breakdown(args.module)
+    startup = breakdown['startup']
+    print(f"Startup of {args.module}: {startup['total_ms']}ms after core.startup was imported")
+    for phase, ms in startup['phases_ms'].items():
+        print(f"  {phase:<14} {ms:>8.1f}ms")
+    
+    imports = breakdown['imports_ms']
+    total = sum(imports.values())
+    print(f"\nImport time by package ({total:.0f}ms, measured under -X importtime):")
+    for package, ms in list(imports.items())[:args.top]:
+        print(f"  {package:<24} {ms:>8.1f}ms  {ms / total:>5.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from datetime import datetime, timezone
+import logging
+from .metrics import LLM_TOKENS
+from .settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+USAGE_FIELDS = ('llm_calls', 'prompt_tokens', 'cached_tokens', 'completion_tokens', 'total_tokens', 'cost_usd')
+
+def _empty_totals() -> Dict[str, Any]:
+    return {field: 0 for field in USAGE_FIELDS}
+
+def _add(totals: Dict[str, Any], usage: Dict[str, Any]):
+    for field in USAGE_FIELDS:
+        totals[field] += usage[field]
+    totals['cost_usd'] = round(totals['cost_usd'], 6)
+
+class RequestUsage:
+    """Token usage and cost of one request, round by round
+    
+    budget is the most tokens the request may still spend across the
+    conversation and user budgets (None = unlimited). Agents check
+    nearly_exhausted before each round and switch to a short final answer
+    when the next call might not fit.
+    """
+    
+    def __init__(self, budget: Optional[int] = None, settings=None):
+        settings = settings or get_settings()
+        self.budget = budget
+        self.completion_reserve = settings.OPENAI_MAX_TOKENS
+        self._prices = (
+            settings.OPENAI_INPUT_COST_PER_1M,
+            settings.OPENAI_CACHED_INPUT_COST_PER_1M,
+            settings.OPENAI_OUTPUT_COST_PER_1M
+        )
+        self.rounds: List[Dict[str, Any]] = []
+        self.totals = _empty_totals()
+        self.by_agent: Dict[str, Dict[str, Any]] = {}
+    
+    def record(self, agent_name: str, completion: Any):
+        """Add one completion's usage (providers that omit usage count as a call only)"""
+        usage = completion.usage
+        details = getattr(usage, 'prompt_tokens_details', None)
+        prompt_tokens = (usage.prompt_tokens or 0) if usage else 0
+        cached_tokens = (getattr(details, 'cached_tokens', None) or 0) if usage else 0
+        completion_tokens = (usage.completion_tokens or 0) if usage else 0
+        
+        input_price, cached_price, output_price = self._prices
+        cost = (
+            (prompt_tokens - cached_tokens) * input_price
+            + cached_tokens * cached_price
+            + completion_tokens * output_price
+        ) / 1_000_000
+        
+        tool_calls = completion.choices[0].message.tool_calls or []
+        entry = {
+            'agent': agent_name,
+            'tools': [tool_call.function.name for tool_call in tool_calls],
+            'llm_calls': 1,
+            'prompt_tokens': prompt_tokens,
+            'cached_tokens': cached_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+            'cost_usd': round(cost, 6)
+        }
+        self.rounds.append(entry)
+        _add(self.totals, entry)
+        _add(self.by_agent.setdefault(agent_name, _empty_totals()), entry)
+        
+        LLM_TOKENS.labels(agent_name, 'prompt').inc(prompt_tokens - cached_tokens)
+        LLM_TOKENS.labels(agent_name, 'cached').inc(cached_tokens)
+        LLM_TOKENS.labels(agent_name, 'completion').inc(completion_tokens)
+    
+    @property
+    def remaining(self) -> Optional[int]:
+        if self.budget is None:
+            return None
+        return self.budget - self.totals['total_tokens']
+    
+    def nearly_exhausted(self, prompt_tokens: int) -> bool:
+        """Whether a call with this prompt and a full completion could overrun the budget"""
+        return self.budget is not None and self.remaining < prompt_tokens + self.completion_reserve
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **self.totals,
+            'budget_remaining': self.remaining,
+            'by_agent': self.by_agent,
+            'rounds': self.rounds
+        }
+
+class UsageLedger:
+    """Running usage totals per agent and per user, and per-conversation and per-user budgets
+    
+    Conversation totals and user totals are kept for the most recently active
+    max_entries of each; user budgets reset at midnight UTC.
+    """
+    
+    def __init__(self, conversation_budget: int = 0, user_daily_budget: int = 0, max_entries: int = 10000):
+        self.conversation_budget = conversation_budget
+        self.user_daily_budget = user_daily_budget
+        self.max_entries = max_entries
+        self._agents: Dict[str, Dict[str, Any]] = {}
+        self._users: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._conversations: OrderedDict[str, int] = OrderedDict()
+    
+    @classmethod
+    def from_settings(cls, settings) -> 'UsageLedger':
+        return cls(
+            settings.CONVERSATION_TOKEN_BUDGET,
+            settings.USER_DAILY_TOKEN_BUDGET,
+            settings.CONVERSATION_STORE_MAX_ENTRIES
+        )
+    
+    def _user(self, user_id: str) -> Dict[str, Any]:
+        today = datetime.now(timezone.utc).date().isoformat()
+        user = self._users.get(user_id)
+        if user is None:
+            user = self._users[user_id] = {**_empty_totals(), 'day': today, 'tokens_today': 0}
+        elif user['day'] != today:
+            user['day'], user['tokens_today'] = today, 0
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_entries:
+            self._users.popitem(last=False)
+        return user
+    
+    def budget(self, conversation_key: Optional[str], user_id: Optional[str]) -> Optional[int]:
+        """Tokens a new request may spend, or None when no budget applies"""
+        remaining = []
+        if self.conversation_budget and conversation_key:
+            remaining.append(self.conversation_budget - self._conversations.get(conversation_key, 0))
+        if self.user_daily_budget and user_id:
+            remaining.append(self.user_daily_budget - self._user(user_id)['tokens_today'])
+        return max(0, min(remaining)) if remaining else None
+    
+    def commit(self, conversation_key: Optional[str], user_id: Optional[str], usage: RequestUsage):
+        """Add a finished request's usage to the running totals"""
+        for agent_name, totals in usage.by_agent.items():
+            _add(self._agents.setdefault(agent_name, _empty_totals()), totals)
+        
+        tokens = usage.totals['total_tokens']
+        if conversation_key:
+            self._conversations[conversation_key] = self._conversations.get(conversation_key, 0) + tokens
+            self._conversations.move_to_end(conversation_key)
+            while len(self._conversations) > self.max_entries:
+                self._conversations.popitem(last=False)
+        if user_id:
+            user = self._user(user_id)
+            _add(user, usage.totals)
+            user['tokens_today'] += tokens
+    
+    def report(self) -> Dict[str, Any]:
+        return {
+            'agents': self._agents,
+            'users': dict(self._users),
+            'budgets': {
+                'conversation_tokens': self.conversation_budget or None,
+                'user_daily_tokens': self.user_daily_budget or None
+            }
+        }
@@ -12,4 +12,8 @@ SUPPORTED_CURRENCIES = [
     "CHF",  # Swiss Franc
     "CNY",  # Chinese Yuan
     "INR"   # Indian Rupee
-] 
\ No newline at end of file
+] 
+
+# Rate table
+RATE_BASE_CURRENCY = "USD"  # One /latest fetch for this base covers every supported pair
+RATE_TABLE_TTL_SECONDS = 60 * 60  # ExchangeRate-API updates rates hourly at most
@@ -0,0 +1,80 @@
+from typing import Dict, Tuple, Optional
+import asyncio
+import time
+import logging
+from .constants import (
+    SUPPORTED_CURRENCIES,
+    RATE_BASE_CURRENCY,
+    RATE_TABLE_TTL_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+class RateFetchError(Exception):
+    """Raised when the rate table cannot be fetched from ExchangeRate-API"""
+    
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+class RateTable:
+    """Cross rates for every pair in SUPPORTED_CURRENCIES, derived from one base fetch"""
+    
+    def __init__(self, base_currency: str, conversion_rates: Dict[str, float]):
+        self.base_currency = base_currency
+        self.fetched_at = time.monotonic()
+        
+        # rate(from, to) = (base -> to) / (base -> from)
+        self.matrix: Dict[Tuple[str, str], float] = {
+            (from_currency, to_currency): conversion_rates[to_currency] / conversion_rates[from_currency]
+            for from_currency in SUPPORTED_CURRENCIES if from_currency in conversion_rates
+            for to_currency in SUPPORTED_CURRENCIES if to_currency in conversion_rates
+        }
+    
+    @property
+    def is_fresh(self) -> bool:
+        return time.monotonic() - self.fetched_at < RATE_TABLE_TTL_SECONDS
+    
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        """Get the conversion rate for a supported pair"""
+        try:
+            return self.matrix[(from_currency, to_currency)]
+        except KeyError:
+            raise ValueError(f"Unsupported currency pair: {from_currency}/{to_currency}")
+
+class RateEngine:
+    """Process-wide rate table shared by the currency tools, refreshed once per TTL"""
+    _instance = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._table = None
+            cls._instance._lock = asyncio.Lock()
+        return cls._instance
+    
+    async def get_table(self, http_client, base_url: str, api_key: str) -> RateTable:
+        """Get the current rate table, fetching it only when missing or expired"""
+        table: Optional[RateTable] = self._table
+        if table is not None and table.is_fresh:
+            return table
+        
+        async with self._lock:
+            # Another request may have refreshed the table while we waited
+            if self._table is not None and self._table.is_fresh:
+                return self._table
+            
+            url = f"{base_url}/{api_key}/latest/{RATE_BASE_CURRENCY}"
+            async with http_client.get(
+                url,
+                headers={'Accept': 'application/json'}
+            ) as response:
+                if not response.ok:
+                    logger.error(f"Currency API error: {response.status}")  # Only log status
+                    raise RateFetchError(f"Currency API error: {response.status}", response.status)
+                
+                data = await response.json()
+            
+            self._table = RateTable(RATE_BASE_CURRENCY, data['conversion_rates'])
+            logger.info(f"Currency API - Rate table refreshed for base {RATE_BASE_CURRENCY}")
+            return self._table
@@ -1,9 +1,12 @@
 from typing import Dict, Any
-import aiohttp
 from pathlib import Path
-from dotenv import load_dotenv
+from core.load_env import load_env_file
 import os
 import logging
+from .constants import EXCHANGERATE_API_BASE
+from .rates import RateEngine, RateFetchError
+from utils.logger import structured
+from core.resilience import status_error
 
 logger = logging.getLogger(__name__)
 
@@ -12,43 +15,38 @@ class CurrencyService:
     
     def __init__(self):
         env_path = Path(__file__).parent / '.env'
-        load_dotenv(env_path)
+        load_env_file(env_path)
         
         self.api_key = os.getenv('EXCHANGERATE_API_KEY')
         if not self.api_key:
             raise ValueError("Missing EXCHANGERATE_API_KEY in .env")
             
-        self.base_url = "https://v6.exchangerate-api.com/v6"
+        self.base_url = EXCHANGERATE_API_BASE
+        self.http_client = None  # Shared connection pool, injected by the Registry
+        self.rates = RateEngine()
     
     async def execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Convert amount between currencies"""
-        logger.info(f"Currency API - Converting {request['amount']} {request['from_currency']} to {request['to_currency']}")
+        logger.info("Currency API - Converting %s %s to %s", request['amount'], request['from_currency'], request['to_currency'],
+                    extra=structured('tool', tool='tool_currency'))
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                url = f"{self.base_url}/{self.api_key}/pair/{request['from_currency']}/{request['to_currency']}"
-                
-                async with session.get(
-                    url,
-                    headers={'Accept': 'application/json'}
-                ) as response:
-                    if not response.ok:
-                        logger.error(f"Currency API error: {response.status}")  # Only log status
-                        return {"error": f"Currency API error: {response.status}"}
-                    
-                    data = await response.json()
-                    
-                    converted_amount = request['amount'] * data['conversion_rate']
-                    logger.info(f"Currency API - Conversion completed at rate: {data['conversion_rate']}")
-                    
-                    return {
-                        'from_amount': request['amount'],
-                        'from_currency': request['from_currency'],
-                        'to_amount': round(converted_amount, 2),
-                        'to_currency': request['to_currency'],
-                        'rate': data['conversion_rate']
-                    }
-                    
-            except Exception as e:
-                logger.error(f"Error converting currency: {str(e)}")
-                raise 
\ No newline at end of file
+        try:
+            table = await self.rates.get_table(self.http_client, self.base_url, self.api_key)
+            rate = round(table.rate(request['from_currency'], request['to_currency']), 6)
+            
+            converted_amount = request['amount'] * rate
+            logger.info("Currency API - Conversion completed at rate: %s", rate, extra=structured('tool', tool='tool_currency'))
+            
+            return {
+                'from_amount': request['amount'],
+                'from_currency': request['from_currency'],
+                'to_amount': round(converted_amount, 2),
+                'to_currency': request['to_currency'],
+                'rate': rate
+            }
+            
+        except RateFetchError as e:
+            return status_error(str(e), e.status)
+        except Exception as e:
+            logger.error(f"Error converting currency: {str(e)}")
+            raise 
\ No newline at end of file
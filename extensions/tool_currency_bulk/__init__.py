@@ -0,0 +1,7 @@
+from .service import CurrencyBulkService
+from .schemas import CurrencyBulkSchema
+
+__all__ = [
+    'CurrencyBulkSchema',
+    'CurrencyBulkService'
+] 
\ No newline at end of file
@@ -0,0 +1,2 @@
+# Max amounts converted in a single bulk call
+MAX_BULK_AMOUNTS = 100
\ No newline at end of file
@@ -0,0 +1,26 @@
+from extensions.tool_currency.constants import SUPPORTED_CURRENCIES
+
+CurrencyBulkSchema = {
+    "type": "object",
+    "required": ["amounts", "from_currency", "to_currency"],
+    "properties": {
+        "amounts": {
+            "type": "array",
+            "items": {
+                "type": "number"
+            },
+            "description": "Amounts to convert, e.g. every place cost in the itinerary"
+        },
+        "from_currency": {
+            "type": "string",
+            "enum": SUPPORTED_CURRENCIES,
+            "description": "Source currency code (e.g., USD, EUR, GBP)"
+        },
+        "to_currency": {
+            "type": "string",
+            "enum": SUPPORTED_CURRENCIES,
+            "description": "Target currency code (e.g., USD, EUR, GBP)"
+        }
+    },
+    "additionalProperties": False
+} 
\ No newline at end of file
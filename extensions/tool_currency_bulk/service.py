@@ -0,0 +1,59 @@
+from typing import Dict, Any
+from pathlib import Path
+from core.load_env import load_env_file
+import os
+import logging
+from extensions.tool_currency.constants import EXCHANGERATE_API_BASE
+from extensions.tool_currency.rates import RateEngine, RateFetchError
+from .constants import MAX_BULK_AMOUNTS
+from utils.logger import structured
+from core.resilience import status_error
+
+logger = logging.getLogger(__name__)
+
+class CurrencyBulkService:
+    """Service for converting many amounts in one call from the shared rate table"""
+    
+    def __init__(self):
+        # Shares credentials with tool_currency
+        env_path = Path(__file__).parent.parent / 'tool_currency' / '.env'
+        load_env_file(env_path)
+        
+        self.api_key = os.getenv('EXCHANGERATE_API_KEY')
+        if not self.api_key:
+            raise ValueError("Missing EXCHANGERATE_API_KEY in .env")
+            
+        self.base_url = EXCHANGERATE_API_BASE
+        self.http_client = None  # Shared connection pool, injected by the Registry
+        self.rates = RateEngine()
+    
+    async def execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a list of amounts between currencies"""
+        amounts = request['amounts']
+        logger.info("Currency API - Converting %d amounts from %s to %s", len(amounts), request['from_currency'], request['to_currency'],
+                    extra=structured('tool', tool='tool_currency_bulk'))
+        
+        if len(amounts) > MAX_BULK_AMOUNTS:
+            return {"error": f"Too many amounts: {len(amounts)} (max {MAX_BULK_AMOUNTS})"}
+        
+        try:
+            table = await self.rates.get_table(self.http_client, self.base_url, self.api_key)
+            rate = round(table.rate(request['from_currency'], request['to_currency']), 6)
+            
+            return {
+                'from_currency': request['from_currency'],
+                'to_currency': request['to_currency'],
+                'rate': rate,
+                'conversions': [
+                    {'from_amount': amount, 'to_amount': round(amount * rate, 2)}
+                    for amount in amounts
+                ],
+                'total_from': round(sum(amounts), 2),
+                'total_to': round(sum(amounts) * rate, 2)
+            }
+            
+        except RateFetchError as e:
+            return status_error(str(e), e.status)
+        except Exception as e:
+            logger.error(f"Error converting currencies: {str(e)}")
+            raise 
\ No newline at end of file
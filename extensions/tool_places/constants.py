@@ -4,6 +4,7 @@ FOURSQUARE_API_BASE = "https://api.foursquare.com/v3"
 # Search parameters
 SEARCH_RADIUS_METERS = 5000  # 5km radius
 RESULTS_LIMIT = 10  # Top 10 places
+MAX_CONCURRENT_SEARCHES = 4  # Category searches in flight at once per request
 
 # Typical costs by category only, no specific places
 TYPICAL_COSTS = {
@@ -1,17 +1,19 @@
-from typing import Dict, Any
-import aiohttp
+from typing import Dict, Any, List, Union
+import asyncio
 from pathlib import Path
-from dotenv import load_dotenv
+from core.load_env import load_env_file
 import os
 import logging
 from .constants import (
     FOURSQUARE_API_BASE,
-    SEARCH_RADIUS_METERS,
     RESULTS_LIMIT,
     CATEGORY_IDS,
+    MAX_CONCURRENT_SEARCHES,
     TYPICAL_COSTS
 )
 import json
+from utils.logger import structured
+from core.resilience import exception_error, status_error, is_error_result
 
 logger = logging.getLogger(__name__)
 
@@ -20,73 +22,119 @@ class PlacesService:
     
     def __init__(self):
         env_path = Path(__file__).parent / '.env'
-        load_dotenv(env_path)
+        load_env_file(env_path)
         
         self.api_key = os.getenv('FOURSQUARE_API_KEY')
         if not self.api_key:
             raise ValueError("Missing FOURSQUARE_API_KEY in .env")
+        
+        self.base_url = FOURSQUARE_API_BASE
+        self.http_client = None  # Shared connection pool, injected by the Registry
+        self.max_concurrency = MAX_CONCURRENT_SEARCHES  # Override with service: {max_concurrency: n} in tools.yaml
+    
+    async def _search_category(self, city: str, category_id: str, semaphore: asyncio.Semaphore) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        """Search one Foursquare category, bounded by the shared semaphore
+        
+        Returns the venues found, or an error result for a non-OK response.
+        """
+        # Query parameters according to Foursquare docs
+        params = {
+            'query': '',  # Empty query to get all places
+            'near': city,  # Use city from request
+            'categories': category_id,
+            'sort': 'RATING',
+            'limit': RESULTS_LIMIT,
+            'fields': 'fsq_id,name,categories,rating,location,distance'
+        }
+        
+        async with semaphore:
+            logger.debug("Searching places for category id: %s", category_id, extra=structured('tool', tool='tool_places'))
+            async with self.http_client.get(
+                f"{self.base_url}/places/search",
+                params=params,
+                headers={
+                    'Authorization': self.api_key,
+                    'Accept': 'application/json'
+                }
+            ) as response:
+                if not response.ok:
+                    logger.error(f"Error from Foursquare: {response.status}")
+                    return status_error(f"Foursquare error: {response.status}", response.status)
+                    
+                places_data = await response.json()
+                return places_data.get('results', [])
     
     async def execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        """Find places of interest in the specified city"""
-        logger.info(f"Places API - Request for: {request['city']}")
+        """Find places of interest in the specified city
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                all_places = []
-                for category in request['categories']:
-                    if category not in CATEGORY_IDS:
+        Categories whose search failed are listed under 'errors', so a partial
+        outage is not mistaken for a city without venues.
+        """
+        logger.info("Places API - Request for: %s", request['city'], extra=structured('tool', tool='tool_places'))
+        
+        try:
+            # Group categories by Foursquare ID so shared IDs are searched once
+            searches = {}
+            for category in request['categories']:
+                if category not in CATEGORY_IDS:
+                    continue
+                searches.setdefault(CATEGORY_IDS[category], []).append(category)
+            
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            results = await asyncio.gather(*[
+                self._search_category(request['city'], category_id, semaphore)
+                for category_id in searches
+            ], return_exceptions=True)
+            results = [
+                exception_error(result) if isinstance(result, Exception) else result
+                for result in results
+            ]
+            
+            # Nothing could be searched - report it so 429/5xx are retried and count against the breaker
+            failures = [result for result in results if is_error_result(result)]
+            if failures and len(failures) == len(results):
+                return next((failure for failure in failures if failure['retryable']), failures[0])
+            
+            # Merge by fsq_id so a venue is listed once, under its first requested category
+            all_places = []
+            errors = {}
+            seen = set()
+            for categories, places in zip(searches.values(), results):
+                if is_error_result(places):
+                    for category in categories:
+                        errors[category] = places['error']
+                    continue
+                category = categories[0]
+                for place in places:
+                    place_id = place.get('fsq_id', place['name'])
+                    if place_id in seen:
                         continue
-                        
-                    category_id = CATEGORY_IDS[category]
-                    logger.debug(f"Searching places for category: {category}")
+                    seen.add(place_id)
                     
-                    # Query parameters according to Foursquare docs
-                    params = {
-                        'query': '',  # Empty query to get all places
-                        'near': request['city'],  # Use city from request
-                        'categories': category_id,
-                        'sort': 'RATING',
-                        'limit': RESULTS_LIMIT,
-                        'fields': 'fsq_id,name,categories,rating,location,distance'
-                    }
+                    # Get typical cost for this place
+                    cost = TYPICAL_COSTS.get(category, {}).get(
+                        place['name'],  # Try exact place name
+                        TYPICAL_COSTS.get(category, {}).get('default', 0)  # Or use default for category
+                    )
                     
-                    async with session.get(
-                        f"{FOURSQUARE_API_BASE}/places/search",
-                        params=params,
-                        headers={
-                            'Authorization': self.api_key,
-                            'Accept': 'application/json'
-                        }
-                    ) as response:
-                        if not response.ok:
-                            logger.error(f"Error from Foursquare: {response.status}")
-                            continue
-                            
-                        places_data = await response.json()
-                        
-                        for place in places_data.get('results', []):
-                            # Get typical cost for this place
-                            cost = TYPICAL_COSTS.get(category, {}).get(
-                                place['name'],  # Try exact place name
-                                TYPICAL_COSTS.get(category, {}).get('default', 0)  # Or use default for category
-                            )
-                            
-                            all_places.append({
-                                'name': place['name'],
-                                'category': category,
-                                'rating': place.get('rating', 'Not rated'),
-                                'address': place['location'].get('formatted_address', 'Address not available'),
-                                'distance': f"{place.get('distance', 0)}m from city center",
-                                'cost_eur': cost  # Add typical cost in EUR
-                            })
-                
-                result = {
-                    'city': request['city'],
-                    'places': all_places
-                }
-                logger.info(f"Places API - Found {len(all_places)} places")
-                return result
-                
-            except Exception as e:
-                logger.error(f"Error finding places: {str(e)}")
-                return {"error": str(e)}
\ No newline at end of file
+                    all_places.append({
+                        'name': place['name'],
+                        'category': category,
+                        'rating': place.get('rating', 'Not rated'),
+                        'address': place['location'].get('formatted_address', 'Address not available'),
+                        'distance': f"{place.get('distance', 0)}m from city center",
+                        'cost_eur': cost  # Add typical cost in EUR
+                    })
+            
+            result = {
+                'city': request['city'],
+                'places': all_places
+            }
+            if errors:
+                result['errors'] = errors
+            logger.info("Places API - Found %d places", len(all_places), extra=structured('tool', tool='tool_places'))
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error finding places: {str(e)}")
+            return exception_error(e)
\ No newline at end of file
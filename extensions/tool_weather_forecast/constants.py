@@ -5,4 +5,10 @@ WEATHER_API_BASE = "http://api.weatherapi.com/v1/forecast.json"
 TEMPERATURE_UNIT = "C"  # Celsius
 
 # Date format for requests
-DATE_FORMAT = "%Y-%m-%d"
\ No newline at end of file
+DATE_FORMAT = "%Y-%m-%d"
+
+# Forecast store
+FORECAST_DAYS = 14  # Max days WeatherAPI returns, fetched once per city
+FORECAST_REFRESH_SECONDS = 3 * 60 * 60  # Refresh each city's forecast every 3 hours
+FORECAST_STORE_MAX_CITIES = 1000  # Least recently used cities are evicted beyond this
+FORECAST_STORE_MAX_ALIASES = 4000  # Requested spellings remembered per resolved location, across all cities
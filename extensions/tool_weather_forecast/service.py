@@ -1,11 +1,13 @@
 from typing import Dict, Any
-import aiohttp
 from pathlib import Path
-from dotenv import load_dotenv
+from core.load_env import load_env_file
 import os
 import logging
 from datetime import datetime
-from .constants import WEATHER_API_BASE, DATE_FORMAT
+from .constants import WEATHER_API_BASE, DATE_FORMAT, FORECAST_DAYS
+from .store import ForecastStore, normalize_city
+from utils.logger import structured
+from core.resilience import status_error, exception_error
 
 logger = logging.getLogger(__name__)
 
@@ -14,62 +16,67 @@ class WeatherForecastService:
     
     def __init__(self):
         env_path = Path(__file__).parent / '.env'
-        load_dotenv(env_path)
+        load_env_file(env_path)
         
         self.api_key = os.getenv('WEATHERAPI_KEY')
         if not self.api_key:
             raise ValueError("Missing WEATHERAPI_KEY in .env")
+        
+        self.base_url = WEATHER_API_BASE
+        self.http_client = None  # Shared connection pool, injected by the Registry
+        self.store = ForecastStore()
     
     async def execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Get weather forecast for specified dates"""
-        logger.info(f"Weather API - Request for: {request['city']}")
+        logger.info("Weather API - Request for: %s", request['city'], extra=structured('tool', tool='tool_weather_forecast'))
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                location = request['city']
-                logger.debug(f"Querying weather for: {location}")
-                
-                params = {
-                    'q': location,
-                    'key': self.api_key,
-                    'days': 14,  # Get max days
-                    'aqi': 'no'
-                }
-                
-                async with session.get(
-                    WEATHER_API_BASE,
-                    params=params,
-                    headers={'Accept': 'application/json'}
-                ) as response:
-                    if not response.ok:
-                        logger.error(f"Weather API error: {response.status}")
-                        return {"error": f"Weather API error: {response.status}"}
-                    
-                    data = await response.json()
-                    
-                    daily_forecasts = {}
-                    for forecast in data['forecast']['forecastday']:
-                        date = datetime.strptime(forecast['date'], DATE_FORMAT)
-                        start_date = datetime.strptime(request['start_date'], DATE_FORMAT)
-                        end_date = datetime.strptime(request['end_date'], DATE_FORMAT)
+        try:
+            location = request['city']
+            key = normalize_city(location)
+            start_date = datetime.strptime(request['start_date'], DATE_FORMAT).date()
+            end_date = datetime.strptime(request['end_date'], DATE_FORMAT).date()
+            
+            forecast = self.store.get(key)
+            if forecast is None:
+                async with self.store.refreshing(key):
+                    # Another request may have refreshed this city while we waited
+                    forecast = self.store.get(key)
+                    if forecast is None:
+                        logger.debug("Querying weather for: %s", location, extra=structured('tool', tool='tool_weather_forecast'))
+                        
+                        params = {
+                            'q': location,
+                            'key': self.api_key,
+                            'days': FORECAST_DAYS,
+                            'aqi': 'no'
+                        }
+                        
+                        async with self.http_client.get(
+                            self.base_url,
+                            params=params,
+                            headers={'Accept': 'application/json'}
+                        ) as response:
+                            if not response.ok:
+                                logger.error(f"Weather API error: {response.status}")
+                                return status_error(f"Weather API error: {response.status}", response.status)
+                            
+                            data = await response.json()
                         
-                        if start_date <= date <= end_date:
-                            daily_forecasts[forecast['date']] = {
-                                'condition': forecast['day']['condition']['text'],
-                                'max_temp': round(forecast['day']['maxtemp_c']),
-                                'min_temp': round(forecast['day']['mintemp_c']),
-                                'rain_chance': forecast['day']['daily_chance_of_rain']
-                            }
-                    
-                    result = {
-                        'city': data['location']['name'],
-                        'country': data['location']['country'],
-                        'forecasts': daily_forecasts
-                    }
-                    
-                    logger.info(f"Weather API - Retrieved {len(daily_forecasts)} days forecast")
-                    return result
-                    
-            except Exception as e:
-                logger.error(f"Error getting weather forecast: {str(e)}")
-                return {"error": str(e)}
\ No newline at end of file
+                        forecast = self.store.put(key, data)
+            else:
+                logger.debug("Weather forecast store hit for: %s", key, extra=structured('cache', tool='tool_weather_forecast'))
+            
+            daily_forecasts = forecast.select(start_date, end_date)
+            
+            result = {
+                'city': forecast.city,
+                'country': forecast.country,
+                'forecasts': daily_forecasts
+            }
+            
+            logger.info("Weather API - Retrieved %d days forecast", len(daily_forecasts), extra=structured('tool', tool='tool_weather_forecast'))
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error getting weather forecast: {str(e)}")
+            return exception_error(e)
\ No newline at end of file
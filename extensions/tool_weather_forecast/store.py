@@ -0,0 +1,132 @@
+from typing import Dict, Any, Optional, List, Tuple
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime, date
+import asyncio
+import time
+import logging
+from .constants import DATE_FORMAT, FORECAST_REFRESH_SECONDS, FORECAST_STORE_MAX_CITIES, FORECAST_STORE_MAX_ALIASES
+from utils.logger import structured
+
+logger = logging.getLogger(__name__)
+
+def normalize_city(city: str) -> str:
+    """Normalize a requested location's spelling: 'Paris,  France' and 'paris, france' match"""
+    parts = (' '.join(part.lower().split()) for part in city.split(','))
+    return ', '.join(part for part in parts if part)
+
+def resolved_key(location: Dict[str, Any]) -> str:
+    """Key of the location WeatherAPI resolved a query to - 'Paris, Texas' and 'Paris, France' differ"""
+    return normalize_city(f"{location['name']}, {location.get('region', '')}, {location['country']}")
+
+class CityForecast:
+    """Full forecast payload for one city, indexed by date ordinal"""
+    __slots__ = ('city', 'country', 'first_ordinal', 'days', 'fetched_at')
+    
+    def __init__(self, data: Dict[str, Any]):
+        self.city = data['location']['name']
+        self.country = data['location']['country']
+        self.fetched_at = time.monotonic()
+        
+        # One compact tuple per day: (date, condition, max_temp, min_temp, rain_chance)
+        parsed = {}
+        for forecast in data['forecast']['forecastday']:
+            day = forecast['day']
+            ordinal = datetime.strptime(forecast['date'], DATE_FORMAT).toordinal()
+            parsed[ordinal] = (
+                forecast['date'],
+                day['condition']['text'],
+                round(day['maxtemp_c']),
+                round(day['mintemp_c']),
+                day['daily_chance_of_rain']
+            )
+        
+        self.first_ordinal = min(parsed) if parsed else 0
+        last_ordinal = max(parsed) if parsed else -1
+        self.days: List[Optional[Tuple]] = [
+            parsed.get(ordinal) for ordinal in range(self.first_ordinal, last_ordinal + 1)
+        ]
+    
+    @property
+    def is_fresh(self) -> bool:
+        return time.monotonic() - self.fetched_at < FORECAST_REFRESH_SECONDS
+    
+    def select(self, start_date: date, end_date: date) -> Dict[str, Dict[str, Any]]:
+        """Get the forecasts between start_date and end_date (inclusive)"""
+        start = max(start_date.toordinal() - self.first_ordinal, 0)
+        end = end_date.toordinal() - self.first_ordinal + 1
+        
+        forecasts = {}
+        for entry in self.days[start:end] if end > start else []:
+            if entry is None:
+                continue
+            forecasts[entry[0]] = {
+                'condition': entry[1],
+                'max_temp': entry[2],
+                'min_temp': entry[3],
+                'rain_chance': entry[4]
+            }
+        return forecasts
+
+class ForecastStore:
+    """Per-city forecast cache refreshed every FORECAST_REFRESH_SECONDS
+    
+    Entries are keyed by the location WeatherAPI resolved, and each requested
+    spelling (normalize_city) is an alias to one, learned when it is fetched.
+    """
+    
+    def __init__(self, max_cities: int = FORECAST_STORE_MAX_CITIES, max_aliases: int = FORECAST_STORE_MAX_ALIASES):
+        self.max_cities = max_cities
+        self.max_aliases = max_aliases
+        self._entries: OrderedDict[str, CityForecast] = OrderedDict()
+        self._aliases: OrderedDict[str, str] = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}  # Holders and waiters per lock
+    
+    def get(self, key: str) -> Optional[CityForecast]:
+        """Get a fresh forecast for a requested city, or None if it needs a refresh"""
+        resolved = self._aliases.get(key)
+        entry = self._entries.get(resolved) if resolved else None
+        if entry is None or not entry.is_fresh:
+            return None
+        self._aliases.move_to_end(key)
+        self._entries.move_to_end(resolved)
+        return entry
+    
+    def put(self, key: str, data: Dict[str, Any]) -> CityForecast:
+        """Store the raw WeatherAPI payload fetched for a requested city"""
+        entry = CityForecast(data)
+        resolved = resolved_key(data['location'])
+        self._entries[resolved] = entry
+        self._entries.move_to_end(resolved)
+        while len(self._entries) > self.max_cities:
+            self._entries.popitem(last=False)
+        
+        # Aliases of evicted entries simply miss until they are fetched again
+        self._aliases[key] = resolved
+        self._aliases.move_to_end(key)
+        while len(self._aliases) > self.max_aliases:
+            self._aliases.popitem(last=False)
+        logger.debug("Forecast store - Cached %d days for: %s as %s", len(entry.days), key, resolved, extra=structured('cache', tool='tool_weather_forecast'))
+        return entry
+    
+    @asynccontextmanager
+    async def refreshing(self, key: str):
+        """Hold the city's lock so concurrent misses trigger a single refresh
+        
+        Spellings already known to resolve to the same location share its lock.
+        The lock is dropped once no caller holds or waits for it, so cities whose
+        fetches keep failing do not accumulate locks.
+        """
+        key = normalize_city(key)
+        lock_key = self._aliases.get(key, key)
+        lock = self._locks.setdefault(lock_key, asyncio.Lock())
+        self._lock_users[lock_key] = self._lock_users.get(lock_key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._lock_users[lock_key] -= 1
+            if not self._lock_users[lock_key]:
+                del self._lock_users[lock_key]
+                del self._locks[lock_key]
@@ -9,6 +9,8 @@ logger = logging.getLogger(__name__)
 class TriageTool(BaseTool):
     """Tool for routing requests to specialized agents"""
     
+    ends_turn = True
+    
     def __init__(self, name: str, description: str):
         super().__init__(
             name=name,
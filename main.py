@@ -2,13 +2,25 @@ import logging
 from typing import Dict, Any, List, Optional
 from services.openai_service import OpenAIClient
 from core.factory import AgentFactory
+from core.initialize import reload_application
 from core.messages import Message
+from core.message_buffer import MessageBuffer
+from core.deadline import Deadline
+from core.base_agent import EventCallback
+from core.settings import get_settings
+from core.conversation_store import create_conversation_store, conversation_key
+from core.cassette import Cassette
+from core.metrics import REQUESTS_IN_FLIGHT, THREAD_STATUS, ROUTING_DECISIONS
+from core.usage import RequestUsage, UsageLedger
+from utils.errors import BudgetExceededError
+from utils.logger import structured
+from core.http_client import get_http_client
 from core.constants import (
-    STATUS_SUCCESS, STATUS_ERROR,
+    STATUS_ERROR,
     THREAD_ACTIVE, THREAD_COMPLETE, THREAD_ERROR,
-    ROLE_ASSISTANT, ROLE_TOOL
+    ROLE_ASSISTANT,
+    EVENT_ROUTING
 )
-import json
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +31,22 @@ class AgenticAIApplication:
         self.factory = factory or AgentFactory()
         self.client = OpenAIClient()
         
+        # Server-side conversation history for delta requests
+        self.settings = settings = get_settings()
+        self.conversations = create_conversation_store(
+            settings.CONVERSATION_STORE,
+            settings.CONVERSATION_STORE_PATH,
+            settings.CONVERSATION_STORE_MAX_ENTRIES
+        )
+        
+        # Token and cost totals per agent and user, with conversation and user budgets
+        self.usage = UsageLedger.from_settings(settings)
+        
+        # Optional record/replay of LLM and tool traffic
+        self.cassette = Cassette.from_settings(settings)
+        self.client.cassette = self.cassette
+        get_http_client().cassette = self.cassette
+        
         # Initialize agents from registry
         self.agents = {}
         for agent_name in self.factory.agent_registry.available_agents:
@@ -30,46 +58,159 @@ class AgenticAIApplication:
             
         logger.info(f"Initialized AgenticAI with agents: {list(self.agents.keys())}")
     
+    async def close(self):
+        """Release the conversation store and cassette - called on shutdown"""
+        await self.conversations.close()
+        if self.cassette:
+            self.cassette.close()
+    
+    def reload_config(self, manifest: Dict[str, Any]):
+        """Swap in the agents and tools of a new manifest for new requests
+        
+        Requests already running keep the agents they started with.
+        """
+        self.agents = reload_application(self.factory, manifest)
+    
+    def warm_up(self):
+        """Import and build the LLM client and the HTTP stack ahead of the first request
+        
+        Blocking; run it in a thread once the app is serving.
+        """
+        try:
+            self.client.openai
+            import aiohttp  # The pool itself opens on the first tool call, on the event loop
+        except Exception:
+            logger.exception("Warm-up failed - the first request will retry it")
+    
+    def after_fork(self, workers: int):
+        """Prepare a forked worker, one of workers processes sharing the same account"""
+        self.conversations.after_fork()
+        self.client.share_rate_limits(1 / workers)
+    
     async def process_request(
         self,
         messages: List[Dict[str, Any]],
         conversation_id: Optional[str] = None,
         thread_id: Optional[str] = None,
         session_id: Optional[str] = None,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        on_event: Optional[EventCallback] = None,
+        delta: bool = False
     ) -> Dict[str, Any]:
-        """Process a chat request through the agent system"""
+        """Process a chat request through the agent system
+        
+        on_event, if given, receives routing, tool and token events as they happen.
+        With delta=True, messages holds only the new turn: history is loaded from
+        the conversation store and only the new messages are returned.
+        """
+        key = conversation_key(conversation_id, thread_id) if conversation_id else None
+        if delta and key is None:
+            raise ValueError("delta requests require a conversation_id")
+        
         try:
-            logger.info(f"Processing request for conversation: {conversation_id}, thread: {thread_id}")
+            history = await self.conversations.load(key) if delta else []
+        except Exception as e:
+            logger.exception("Error loading conversation history")
+            THREAD_STATUS.labels(THREAD_ERROR).inc()
+            return {
+                "result": STATUS_ERROR,
+                "conversation_id": conversation_id,
+                "thread_id": thread_id,
+                "session_id": session_id,
+                "thread_status": THREAD_ERROR,
+                "messages": messages,
+                "error_details": f"Could not load the conversation history: {str(e)}"
+            }
+        message_objects = history + [
+            msg if isinstance(msg, Message) else Message(**msg)
+            for msg in messages
+        ]
+        
+        usage = RequestUsage(self.usage.budget(key, user_id), self.settings)
+        with REQUESTS_IN_FLIGHT.track_inprogress():
+            result = await self._process_request(
+                message_objects,
+                conversation_id=conversation_id,
+                thread_id=thread_id,
+                session_id=session_id,
+                user_id=user_id,
+                on_event=on_event,
+                usage=usage
+            )
+        THREAD_STATUS.labels(result["thread_status"]).inc()
+        self.usage.commit(key, user_id, usage)
+        result["usage"] = usage.to_dict()
+        
+        # Keep the server-side history current so the client can switch to deltas;
+        # the turn is still returned if it cannot be stored
+        if key and result["thread_status"] != THREAD_ERROR:
+            try:
+                await self.conversations.save(key, result["messages"])
+            except Exception:
+                logger.exception("Error saving conversation history for %s", key)
+        
+        if delta:
+            result["messages"] = result["messages"][len(history):]
+        return result
+    
+    async def _process_request(
+        self,
+        messages: List[Dict[str, Any]],
+        conversation_id: Optional[str] = None,
+        thread_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        on_event: Optional[EventCallback] = None,
+        usage: Optional[RequestUsage] = None
+    ) -> Dict[str, Any]:
+        """Run one turn through triage and the target agent"""
+        # One wall-clock budget covers triage, the target agent and all their tool calls
+        deadline = Deadline.for_request(self.settings)
+        # The whole turn runs on this set of agents, even if the config is reloaded meanwhile
+        agents = self.agents
+        try:
+            logger.info("Processing request for conversation: %s, thread: %s", conversation_id, thread_id,
+                        extra=structured('request', conversation_id=conversation_id, thread_id=thread_id))
             
-            # Convert messages to Message objects
-            message_objects = [
-                msg if isinstance(msg, Message) else Message(**msg)
-                for msg in messages
-            ]
+            if usage and usage.remaining is not None and usage.remaining <= 0:
+                raise BudgetExceededError(f"Token budget exhausted for conversation {conversation_id}, user {user_id}")
             
-            # Process through triage agent first
-            current_messages, had_error, is_server_error = await self.agents['agent_triage'].process_message(
-                message_objects, 
-                self.client
-            )
+            # Convert messages to Message objects, serialized once for every agent call
+            message_objects = MessageBuffer(messages)
             
-            # Check for routing in the last tool response
-            routing = None
-            for msg in reversed(current_messages):
-                if msg.role == ROLE_TOOL:
-                    try:
-                        tool_result = json.loads(msg.content)
-                        if isinstance(tool_result, dict):
-                            routing = tool_result.get("routing")
-                            if routing:
-                                break
-                    except (json.JSONDecodeError, AttributeError):
-                        logger.warning(f"Invalid tool response: {msg.content}")
-                        continue
+            error_details = None
+            
+            # Try the local router first; fall back to LLM triage when it is unsure
+            triage_agent = agents['agent_triage']
+            routing = triage_agent.router.route(message_objects) if triage_agent.router else None
             
+            routing_source = "router" if routing else "llm"
+            
+            if routing:
+                current_messages, had_error, is_server_error = message_objects, False, False
+            else:
+                # Process through triage agent first
+                current_messages, had_error, is_server_error = await triage_agent.process_message(
+                    message_objects, 
+                    self.client,
+                    on_event,
+                    deadline,
+                    usage
+                )
+                
+                # Check for routing in the last tool response
+                for msg, tool_result in reversed(current_messages.tool_results()):
+                    if isinstance(tool_result, dict):
+                        routing = tool_result.get("routing")
+                        if routing:
+                            break
+                
             # Route to appropriate agent if routing exists
             if routing:
+                ROUTING_DECISIONS.labels(routing, routing_source).inc()
+                if on_event:
+                    await on_event(EVENT_ROUTING, {"target": routing, "source": routing_source})
+                
                 if routing == "transfer_to_unsupported":
                     # Special case: unsupported request
                     return {
@@ -78,20 +219,24 @@ class AgenticAIApplication:
                         "thread_id": thread_id,
                         "session_id": session_id,
                         "thread_status": THREAD_COMPLETE,  # Mark as complete
-                        "messages": current_messages,
+                        "messages": current_messages.messages,
                         "error_details": None
                     }
                     
                 # Normal routing continues...
                 target_agent = routing.replace("transfer_to_", "")
-                if target_agent in self.agents:
-                    logger.info(f"Routing to: {target_agent}")
-                    current_messages, had_error, is_server_error = await self.agents[target_agent].process_message(
+                if target_agent in agents:
+                    logger.info("Routing to: %s", target_agent, extra=structured('routing', target=target_agent, source=routing_source))
+                    current_messages, had_error, is_server_error = await agents[target_agent].process_message(
                         message_objects,
-                        self.client
+                        self.client,
+                        on_event,
+                        deadline,
+                        usage
                     )
                 else:
                     logger.error(f"Unknown routing target: {target_agent}")
+                    error_details = f"Unknown routing target: {target_agent}"
                     had_error = True
                     is_server_error = True
             
@@ -110,6 +255,8 @@ class AgenticAIApplication:
                 if is_server_error:
                     thread_status = THREAD_ERROR
                 result = last_assistant_message.content if last_assistant_message else "An error occurred"
+                # Agents report a turn that ended without the model's final answer
+                error_details = error_details or "The agent could not complete its answer"
             elif last_assistant_message:
                 result = last_assistant_message.content or ""
                 
@@ -122,8 +269,8 @@ class AgenticAIApplication:
                 
                 if was_specialized_agent:
                     tool_executed = any(
-                        msg.role == ROLE_TOOL and not json.loads(msg.content).get("error")
-                        for msg in current_messages
+                        not (isinstance(tool_result, dict) and tool_result.get("error"))
+                        for msg, tool_result in current_messages.tool_results()
                     )
                     if tool_executed:
                         thread_status = THREAD_COMPLETE
@@ -136,12 +283,15 @@ class AgenticAIApplication:
                 "thread_id": thread_id,
                 "session_id": session_id,
                 "thread_status": thread_status,
-                "messages": current_messages,
-                "error_details": str(last_assistant_message.error) if had_error else None
+                "messages": current_messages.messages,
+                "error_details": error_details
             }
             
         except Exception as e:
-            logger.exception("Error processing request")
+            if isinstance(e, BudgetExceededError):
+                logger.warning(str(e))
+            else:
+                logger.exception("Error processing request")
             return {
                 "result": STATUS_ERROR,
                 "conversation_id": conversation_id,
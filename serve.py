@@ -0,0 +1,189 @@
+"""Production server: pre-forked uvicorn workers sharing one listening socket
+
+    python serve.py --workers 4 --port 8000
+
+The application (settings, manifest, registry and agents) is loaded once in
+the master and inherited by every worker through fork. Workers run uvloop and
+httptools when they are installed (pip install uvloop httptools) and fall back
+to asyncio and h11. On SIGTERM or SIGINT workers stop accepting connections,
+finish their in-flight conversations within the graceful timeout and run the
+app's shutdown. A worker that dies is replaced.
+"""
+from typing import Dict, List, Optional, Set
+import argparse
+import importlib.util
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+import uvicorn
+from core.load_env import load_environment
+from core.settings import get_settings
+from core.cassette import CASSETTE_RECORD
+
+logger = logging.getLogger(__name__)
+
+# A worker that exits sooner than this after starting is replaced only after this pause
+MIN_WORKER_UPTIME = 1.0
+
+# Extra seconds past the graceful timeout before stragglers are killed
+KILL_GRACE_SECONDS = 5.0
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn server that also drains when its master process goes away"""
+    
+    def __init__(self, config: uvicorn.Config, master_pid: int):
+        super().__init__(config)
+        self.master_pid = master_pid
+    
+    async def on_tick(self, counter: int) -> bool:
+        if counter % 10 == 0 and os.getppid() != self.master_pid:
+            self.should_exit = True
+        return await super().on_tick(counter)
+
+def run_worker(sock: socket.socket, workers: int, graceful_timeout: float):
+    """Serve the inherited socket in a forked worker until told to drain"""
+    import api
+    from utils.logger import configure_logging
+    
+    # The master's log listener thread and SQLite connection do not survive fork
+    configure_logging()
+    api.app_instance.after_fork(workers)
+    
+    config = uvicorn.Config(
+        api.app,
+        loop="auto",  # uvloop when installed
+        http="auto",  # httptools when installed
+        lifespan="on",
+        log_config=None,
+        timeout_graceful_shutdown=graceful_timeout
+    )
+    WorkerServer(config, os.getppid()).run(sockets=[sock])
+
+class Master:
+    """Forks the workers, replaces any that die and drains them all on SIGTERM or SIGINT"""
+    
+    def __init__(self, sock: socket.socket, workers: int, graceful_timeout: float):
+        self.sock = sock
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.children: Dict[int, float] = {}  # pid -> start time
+        self.stopping = False
+        self.kill_at = float('inf')
+        self._signalled: Set[int] = set()
+    
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(self.sock, self.workers, self.graceful_timeout)
+            except BaseException:
+                logger.exception("Worker %d failed", os.getpid())
+                code = 1
+            finally:
+                from utils.logger import shutdown_logging
+                shutdown_logging()
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        logger.info("Started worker %d", pid)
+    
+    def stop(self, signum: int, frame):
+        if not self.stopping:
+            logger.info("Received %s, draining %d workers", signal.Signals(signum).name, len(self.children))
+            self.stopping = True
+            self.kill_at = time.monotonic() + self.graceful_timeout + KILL_GRACE_SECONDS
+    
+    def reaped(self, pid: int, status: int):
+        started = self.children.pop(pid)
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            from prometheus_client import multiprocess
+            multiprocess.mark_process_dead(pid)
+        if self.stopping:
+            logger.info("Worker %d stopped", pid)
+            return
+        logger.warning("Worker %d exited with status %d, replacing it", pid, os.waitstatus_to_exitcode(status))
+        if time.monotonic() - started < MIN_WORKER_UPTIME:
+            time.sleep(MIN_WORKER_UPTIME)
+        if not self.stopping:
+            self.spawn()
+    
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+        
+        while self.children:
+            if self.stopping:
+                # Signalled from the loop rather than the handler, so a worker forked
+                # while the signal arrived is drained too
+                for pid in self.children.keys() - self._signalled:
+                    os.kill(pid, signal.SIGTERM)
+                    self._signalled.add(pid)
+                if time.monotonic() > self.kill_at:
+                    logger.warning("Killing %d workers still busy after %.0fs", len(self.children), self.graceful_timeout)
+                    for pid in self.children:
+                        os.kill(pid, signal.SIGKILL)
+                    self.kill_at = float('inf')
+            
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid:
+                self.reaped(pid, status)
+            else:
+                time.sleep(0.2)
+        logger.info("All workers stopped")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Serve the API with pre-forked worker processes")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, help="Worker processes (default: WEB_WORKERS, or one per CPU)")
+    parser.add_argument('--graceful-timeout', type=float, help="Seconds to drain on shutdown (default: WEB_GRACEFUL_TIMEOUT)")
+    args = parser.parse_args(argv)
+    
+    load_environment()
+    settings = get_settings()
+    workers = args.workers or settings.WEB_WORKERS or os.cpu_count() or 1
+    graceful_timeout = args.graceful_timeout if args.graceful_timeout is not None else settings.WEB_GRACEFUL_TIMEOUT
+    if workers > 1 and settings.CASSETTE_MODE == CASSETTE_RECORD:
+        parser.error("Recording a cassette needs a single worker (--workers 1)")
+    
+    # Workers write metric samples to files in this directory so /metrics covers all of them;
+    # it must be set before prometheus_client is imported
+    metrics_dir = None
+    if workers > 1 and not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='agentic-metrics-')
+    
+    import api  # Loads the manifest, registry and agents once, before forking
+    from utils.logger import shutdown_logging
+    
+    if workers > 1 and settings.CONVERSATION_STORE == "memory":
+        logger.warning("Each worker has its own memory conversation store; use CONVERSATION_STORE=sqlite for delta requests")
+    
+    sock = socket.create_server((args.host, args.port), backlog=2048)
+    logger.info(
+        "Serving on http://%s:%d with %d workers (loop: %s, http: %s)",
+        args.host, args.port, workers,
+        "uvloop" if _installed('uvloop') else "asyncio",
+        "httptools" if _installed('httptools') else "h11"
+    )
+    # Hand logging back to a direct handler: the listener thread would not survive fork
+    shutdown_logging()
+    try:
+        Master(sock, workers, graceful_timeout).run()
+    finally:
+        sock.close()
+        if metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
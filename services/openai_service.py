@@ -1,43 +1,297 @@
-from openai import AsyncOpenAI
 from core.messages import Message
+from core.message_buffer import MessageBuffer
+from core.cassette import KIND_CHAT
+from core.metrics import LLM_REQUEST_SECONDS, LLM_IN_FLIGHT
 from core.settings import get_settings
-from typing import List, Dict, Any, Optional
+from core.constants import AGENT_PRIORITY_DEFAULT, LLM_RETRY_BASE_DELAY, LLM_RETRY_MAX_DELAY
+from services.prompt_cache import PromptCacheStats, canonical_tools
+from services.rate_limiter import RateLimitScheduler, parse_reset
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Union, TYPE_CHECKING
+import asyncio
+import random
+import re
+import time
 import logging
 import json
+from utils.logger import structured
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+    from openai.types.chat import ChatCompletion
 
 logger = logging.getLogger(__name__)
 
+# Word-sized chunks for re-streaming a replayed completion
+_TOKEN_CHUNK = re.compile(r'\S+\s*|\s+')
+
 class OpenAIClient:
     def __init__(self):
         self.settings = get_settings()
-        self.openai = AsyncOpenAI(
-            api_key=self.settings.OPENAI_API_KEY,
-            organization=self.settings.OPENAI_ORG_ID if hasattr(self.settings, 'OPENAI_ORG_ID') else None
+        self._openai = None
+        self.cache_stats = PromptCacheStats()
+        self.cassette = None  # Optional Cassette recording or replaying completions
+        self.share_rate_limits(1.0)
+    
+    @property
+    def openai(self) -> 'AsyncOpenAI':
+        """The SDK client, built on first use
+        
+        Importing openai and building its transport take longer than the rest
+        of startup together, so neither happens before the app is ready.
+        """
+        if self._openai is None:
+            from openai import AsyncOpenAI
+            self._openai = AsyncOpenAI(
+                api_key=self.settings.OPENAI_API_KEY,
+                organization=self.settings.OPENAI_ORG_ID if hasattr(self.settings, 'OPENAI_ORG_ID') else None,
+                max_retries=0  # Retries go through the scheduler instead
+            )
+        return self._openai
+    
+    def share_rate_limits(self, share: float):
+        """Enforce only this fraction of the account's limits (one share per worker process)"""
+        self.scheduler = RateLimitScheduler(
+            self.settings.OPENAI_MAX_CONCURRENCY,
+            self.settings.OPENAI_REQUESTS_PER_MINUTE,
+            self.settings.OPENAI_TOKENS_PER_MINUTE,
+            share
         )
     
-    async def chat(self, messages: List[Message], tools: Optional[List[Dict[str, Any]]] = None):
-        """Simple OpenAI chat completion"""
+    async def chat(
+        self,
+        messages: Union[MessageBuffer, List[Message]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+        agent_name: Optional[str] = None,
+        tool_choice: Optional[str] = None,
+        timeout: Optional[float] = None,
+        priority: int = AGENT_PRIORITY_DEFAULT,
+        max_tokens: Optional[int] = None
+    ):
+        """Simple OpenAI chat completion, streamed token by token when on_token is given
+        
+        The request prefix is kept byte-stable for the provider's prompt cache:
+        tools in canonical order and serialization, then the system message,
+        then the append-only history. Cached prompt tokens are recorded per agent.
+        Pass a MessageBuffer to reuse its already serialized messages.
+        tool_choice defaults to "auto"; timeout bounds the whole call, retries included.
+        Calls are admitted by the rate-limit scheduler, lower priority values first.
+        max_tokens caps the completion length for this call.
+        """
+        LLM_IN_FLIGHT.inc()
+        requested = time.perf_counter()
+        outcome = "error"
         try:
-            messages_dict = [
-                message.model_dump() if isinstance(message, Message)
-                else Message(**message).model_dump()
-                for message in messages
-            ]
+            if not isinstance(messages, MessageBuffer):
+                messages = MessageBuffer(messages)
+            messages_dict = messages.to_openai()
+            tools = canonical_tools(tools)
+            tool_tokens = tools.estimated_tokens if tools else 0
+            tool_choice = (tool_choice or "auto") if tools else None
             
-            # Only log tool calls from response
-            response = await self.openai.chat.completions.create(
-                model=self.settings.OPENAI_MODEL,
-                messages=messages_dict,
-                tools=tools,
-                tool_choice="auto" if tools else None
-            )
+            # Reserve the prompt estimate (messages and tool schemas) plus the completion allowance against the TPM budget
+            reserved = messages.estimated_tokens + tool_tokens + (max_tokens or self.settings.OPENAI_MAX_TOKENS)
+            if self.cassette is not None and self.cassette.replaying:
+                response = await asyncio.wait_for(self._replay(messages_dict, tools, tool_choice, on_token), timeout)
+            else:
+                started = time.perf_counter()
+                response = await asyncio.wait_for(
+                    self._complete(messages_dict, tools, tool_choice, on_token, priority, reserved, max_tokens),
+                    timeout
+                )
+                if self.cassette is not None:
+                    self.cassette.record(
+                        KIND_CHAT,
+                        self.cassette.chat_key(messages_dict, tools, tool_choice),
+                        response.model_dump(mode='json', exclude_none=True),
+                        time.perf_counter() - started
+                    )
+            
+            self.cache_stats.record(agent_name, response.usage)
             
+            # Only log tool calls from response
             if response.choices[0].message.tool_calls:
                 tool_calls = [t.function.name for t in response.choices[0].message.tool_calls]
-                logger.debug(f"OpenAI tool calls: {tool_calls}")
+                logger.debug("OpenAI tool calls: %s", tool_calls, extra=structured('llm', agent=agent_name))
             
+            outcome = "ok"
             return response
             
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            logger.error("OpenAI request timed out (timeout: %s)", timeout, extra=structured('llm', agent=agent_name))
+            raise
         except Exception as e:
-            logger.error(f"OpenAI error: {str(e)}")
-            raise
\ No newline at end of file
+            logger.error("OpenAI error: %s", e, extra=structured('llm', agent=agent_name))
+            raise
+        finally:
+            LLM_IN_FLIGHT.dec()
+            LLM_REQUEST_SECONDS.labels(agent_name or "unknown", outcome).observe(time.perf_counter() - requested)
+    
+    async def _complete(
+        self,
+        messages_dict: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]],
+        tool_choice: Optional[str],
+        on_token: Optional[Callable[[str], Awaitable[None]]],
+        priority: int,
+        reserved: int,
+        max_tokens: Optional[int] = None
+    ) -> 'ChatCompletion':
+        """Send a completion through the scheduler, retrying rate limits and transient errors
+        
+        Every admitted attempt settles its token reservation, however it ends.
+        """
+        from openai import RateLimitError, APIConnectionError, InternalServerError
+        
+        # An attempt cut short after reaching the provider is assumed to have cost its prompt
+        prompt_tokens = reserved - (max_tokens or self.settings.OPENAI_MAX_TOKENS)
+        attempt = 0
+        while True:
+            streamed = False
+            admitted, used = False, None
+            
+            async def forward(token: str):
+                nonlocal streamed
+                streamed = True
+                await on_token(token)
+            
+            try:
+                async with self.scheduler.slot(priority, reserved):
+                    admitted, used = True, prompt_tokens
+                    raw = await self.openai.chat.completions.with_raw_response.create(
+                        model=self.settings.OPENAI_MODEL,
+                        messages=messages_dict,
+                        tools=tools,
+                        tool_choice=tool_choice,
+                        **({"max_tokens": max_tokens} if max_tokens else {}),
+                        **({"stream": True, "stream_options": {"include_usage": True}} if on_token else {})
+                    )
+                    self.scheduler.update_from_headers(raw.headers)
+                    if on_token:
+                        response = await self._read_stream(raw.parse(), forward)
+                    else:
+                        response = raw.parse()
+                
+                used = response.usage.total_tokens if response.usage else None
+                return response
+                
+            except (RateLimitError, APIConnectionError, InternalServerError) as e:
+                if not streamed:
+                    used = 0  # Rejected or never delivered - nothing was charged
+                # Tokens already sent to the client cannot be taken back, and quota errors do not clear
+                if streamed or attempt >= self.settings.OPENAI_MAX_RETRIES or getattr(e, 'code', None) == 'insufficient_quota':
+                    raise
+                
+                delay = self._retry_delay(e, attempt)
+                if isinstance(e, RateLimitError):
+                    self.scheduler.throttle(delay)
+                attempt += 1
+                logger.warning(f"OpenAI {e.__class__.__name__}, retry {attempt} in {delay:.2f}s")
+            finally:
+                # Timeouts and cancelled streams settle here too, not just successes
+                if admitted:
+                    self.scheduler.record_usage(reserved, used)
+            
+            # Back off with the attempt's reservation already settled
+            await asyncio.sleep(delay)
+    
+    async def _replay(
+        self,
+        messages_dict: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]],
+        tool_choice: Optional[str],
+        on_token: Optional[Callable[[str], Awaitable[None]]]
+    ) -> 'ChatCompletion':
+        """Serve a recorded completion, re-streaming its content when on_token is given"""
+        from openai.types.chat import ChatCompletion
+        
+        recorded = await self.cassette.replay(KIND_CHAT, self.cassette.chat_key(messages_dict, tools, tool_choice))
+        completion = ChatCompletion.model_validate(recorded)
+        content = completion.choices[0].message.content
+        if on_token and content:
+            for token in _TOKEN_CHUNK.findall(content):
+                await on_token(token)
+        return completion
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Use the provider's retry hint when there is one, else jittered exponential backoff"""
+        response = getattr(error, 'response', None)
+        headers = response.headers if response is not None else {}
+        
+        hint = None
+        try:
+            if headers.get('retry-after-ms'):
+                hint = float(headers['retry-after-ms']) / 1000
+            elif headers.get('retry-after'):
+                hint = float(headers['retry-after'])
+        except ValueError:
+            pass
+        if hint is None:
+            resets = [
+                parse_reset(headers.get('x-ratelimit-reset-requests')),
+                parse_reset(headers.get('x-ratelimit-reset-tokens'))
+            ]
+            hint = max((reset for reset in resets if reset), default=None)
+        
+        if hint is not None:
+            # Spread waiting callers so they do not all return at the same instant
+            return min(LLM_RETRY_MAX_DELAY, hint) * random.uniform(1.0, 1.25)
+        return min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * 2 ** attempt) * random.uniform(0.5, 1.5)
+    
+    async def _read_stream(
+        self,
+        stream,
+        on_token: Callable[[str], Awaitable[None]]
+    ) -> 'ChatCompletion':
+        """Forward streamed content tokens and rebuild the full response"""
+        from openai.types.chat import ChatCompletion
+        
+        completion_id, created, model = None, 0, self.settings.OPENAI_MODEL
+        content, finish_reason, usage = [], None, None
+        tool_calls: Dict[int, Dict[str, Any]] = {}
+        
+        async for chunk in stream:
+            completion_id, created, model = chunk.id, chunk.created, chunk.model
+            if chunk.usage:
+                usage = chunk.usage.model_dump()
+            if not chunk.choices:
+                continue
+            
+            choice = chunk.choices[0]
+            finish_reason = choice.finish_reason or finish_reason
+            delta = choice.delta
+            
+            if delta.content:
+                content.append(delta.content)
+                await on_token(delta.content)
+            
+            # Tool call names and arguments arrive in fragments keyed by index
+            for fragment in delta.tool_calls or []:
+                call = tool_calls.setdefault(fragment.index, {
+                    "id": None,
+                    "type": "function",
+                    "function": {"name": "", "arguments": ""}
+                })
+                if fragment.id:
+                    call["id"] = fragment.id
+                if fragment.function:
+                    call["function"]["name"] += fragment.function.name or ""
+                    call["function"]["arguments"] += fragment.function.arguments or ""
+        
+        return ChatCompletion.model_validate({
+            "id": completion_id or "stream",
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "finish_reason": finish_reason or "stop",
+                "message": {
+                    "role": "assistant",
+                    "content": "".join(content) or None,
+                    "tool_calls": [tool_calls[i] for i in sorted(tool_calls)] or None
+                }
+            }],
+            "usage": usage
+        })
\ No newline at end of file
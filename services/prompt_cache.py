@@ -0,0 +1,71 @@
+from typing import List, Dict, Any, Optional
+import json
+import logging
+from utils.logger import structured
+from core.compaction import estimate_tokens, encode_compact
+
+logger = logging.getLogger(__name__)
+
+def _canonical(value: Any) -> Any:
+    """Recursively sort dict keys so equal definitions serialize to identical bytes"""
+    if isinstance(value, dict):
+        return {key: _canonical(value[key]) for key in sorted(value)}
+    if isinstance(value, list):
+        return [_canonical(item) for item in value]
+    return value
+
+class CanonicalTools(list):
+    """A tool list in canonical form, with its prompt token estimate
+    
+    Tools are ordered by function name with sorted keys, so the request prefix
+    (tools, then system instructions) is byte-stable across calls and restarts.
+    Agents build one when their tools are set and pass it on every call, so it
+    lives and is replaced with the agent's configuration.
+    """
+    
+    def __init__(self, tools: List[Dict[str, Any]]):
+        super().__init__(
+            _canonical(tool)
+            for tool in sorted(tools, key=lambda tool: tool['function']['name'])
+        )
+        self.estimated_tokens = estimate_tokens(encode_compact(self))
+
+def canonical_tools(tools: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+    """Get tools in canonical form, reusing a list that already is"""
+    if not tools or isinstance(tools, CanonicalTools):
+        return tools
+    return CanonicalTools(tools)
+
+class PromptCacheStats:
+    """Per-agent prompt and cached token counts taken from completion usage"""
+    
+    def __init__(self):
+        self._agents: Dict[str, Dict[str, int]] = {}
+    
+    def record(self, agent_name: Optional[str], usage: Any):
+        """Record one completion's usage (None-safe for providers that omit it)"""
+        if usage is None:
+            return
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', None) or 0
+        
+        stats = self._agents.setdefault(agent_name or "unknown", {
+            'calls': 0,
+            'prompt_tokens': 0,
+            'cached_tokens': 0
+        })
+        stats['calls'] += 1
+        stats['prompt_tokens'] += usage.prompt_tokens or 0
+        stats['cached_tokens'] += cached_tokens
+        logger.debug("Prompt cache - %s: %s/%s prompt tokens cached", agent_name, cached_tokens, usage.prompt_tokens,
+                     extra=structured('llm', agent=agent_name))
+    
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-agent totals with their cache hit rate"""
+        return {
+            agent: {
+                **stats,
+                'hit_rate': round(stats['cached_tokens'] / stats['prompt_tokens'], 4) if stats['prompt_tokens'] else 0.0
+            }
+            for agent, stats in self._agents.items()
+        }
@@ -0,0 +1,170 @@
+from typing import Dict, Any, List, Optional, Mapping
+from contextlib import asynccontextmanager
+import asyncio
+import heapq
+import itertools
+import math
+import re
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Parse an x-ratelimit-reset-* header ("1s", "6m0s", "120ms") into seconds"""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+class TokenBucket:
+    """Per-minute budget refilled continuously, resynced from the provider's headers
+    
+    share is this process's fraction of the account limit when several worker
+    processes call the provider with the same key.
+    """
+    
+    def __init__(self, per_minute: int, share: float = 1.0):
+        self.share = share
+        self.capacity = float(per_minute) * share
+        self.level = self.capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+    
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount is available (requests larger than capacity wait for a full bucket)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) * 60 / self.capacity
+    
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+    
+    def refund(self, amount: float):
+        """Return (or with a negative amount, charge) the gap between estimated and actual use"""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+    
+    def sync(self, limit: Optional[str], remaining: Optional[str]):
+        """Adopt the provider's limit and never assume more headroom than it reports"""
+        self._refill()
+        if limit and limit.isdigit():
+            self.capacity = float(limit) * self.share
+        if remaining and remaining.isdigit():
+            self.level = min(self.level, float(remaining) * self.share)
+
+class RateLimitScheduler:
+    """Client-side admission control for LLM calls
+    
+    Calls wait for a concurrency slot plus room in the requests-per-minute and
+    tokens-per-minute buckets, and are admitted in priority order (lower value
+    first) so triage is not stuck behind long specialist rounds. A 429 pauses
+    all admissions until the provider's reset time instead of letting every
+    queued call hit the same limit. With share < 1 the scheduler enforces
+    that fraction of every limit, one share per worker process.
+    """
+    
+    def __init__(self, max_concurrency: int, requests_per_minute: int, tokens_per_minute: int, share: float = 1.0):
+        self.max_concurrency = max(1, math.ceil(max_concurrency * share))
+        self.requests = TokenBucket(requests_per_minute, share)
+        self.tokens = TokenBucket(tokens_per_minute, share)
+        self._active = 0
+        self._waiters: List[tuple] = []
+        self._order = itertools.count()
+        self._paused_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._counts = {'admitted': 0, 'waited': 0, 'throttled': 0}
+    
+    @asynccontextmanager
+    async def slot(self, priority: int, tokens: float):
+        """Hold a concurrency slot, with tokens reserved, for one call"""
+        await self._acquire(priority, tokens)
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._dispatch()
+    
+    async def _acquire(self, priority: int, tokens: float):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), tokens, future))
+        self._dispatch()
+        if future.done():
+            return
+        
+        self._counts['waited'] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as we were cancelled - hand the slot back
+                self._active -= 1
+                self._dispatch()
+            raise
+    
+    def _dispatch(self):
+        """Admit waiters in priority order while there is capacity"""
+        while self._waiters and self._active < self.max_concurrency:
+            priority, _, tokens, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            
+            wait = max(
+                self._paused_until - time.monotonic(),
+                self.requests.wait_time(1),
+                self.tokens.wait_time(tokens)
+            )
+            if wait > 0:
+                self._schedule(wait)
+                return
+            
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self._active += 1
+            self._counts['admitted'] += 1
+            future.set_result(None)
+    
+    def _schedule(self, delay: float):
+        if self._timer is None or self._timer.cancelled():
+            def wake():
+                self._timer = None
+                self._dispatch()
+            self._timer = asyncio.get_running_loop().call_later(delay, wake)
+    
+    def record_usage(self, reserved: float, used: Optional[int]):
+        """Settle a call's token reservation against the tokens it actually used"""
+        if used is not None:
+            self.tokens.refund(reserved - used)
+            self._dispatch()
+    
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Resync the buckets from x-ratelimit-* response headers"""
+        self.requests.sync(headers.get('x-ratelimit-limit-requests'), headers.get('x-ratelimit-remaining-requests'))
+        self.tokens.sync(headers.get('x-ratelimit-limit-tokens'), headers.get('x-ratelimit-remaining-tokens'))
+    
+    def throttle(self, seconds: float):
+        """Hold back all admissions for seconds after the provider rate-limited a call"""
+        self._counts['throttled'] += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        logger.warning(f"Rate limited - pausing LLM calls for {seconds:.2f}s")
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counts,
+            'active': self._active,
+            'queued': sum(1 for waiter in self._waiters if not waiter[3].done()),
+            'requests_available': round(self.requests.level, 1),
+            'tokens_available': round(self.tokens.level)
+        }
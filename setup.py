@@ -16,6 +16,9 @@ setup(
         "fastapi>=0.109.2",
         "uvicorn>=0.27.1",
         
+        # Metrics
+        "prometheus-client>=0.19.0",
+        
         # Environment and config
         "python-dotenv>=1.0.0",
         
@@ -30,6 +33,11 @@ setup(
             'pytest>=8.0.0',
             'black>=24.1.1',
             'isort>=5.13.2'
+        ],
+        # Faster event loop and HTTP parser for serve.py, used when installed
+        'server': [
+            'uvloop>=0.19.0',
+            'httptools>=0.6.1'
         ]
     },
     python_requires='>=3.11',
@@ -3,6 +3,9 @@ from utils.errors import *
 
 __all__ = [
     'get_logger',
+    'configure_logging',
+    'shutdown_logging',
+    'structured',
     'log_conversation_start',
     'log_agent_handoff',
     'log_openai_exchange',
@@ -13,5 +16,6 @@ __all__ = [
     'AppError',
     'AuthError',
     'ValidationError',
-    'ToolExecutionError'
+    'ToolExecutionError',
+    'BudgetExceededError'
 ] 
\ No newline at end of file
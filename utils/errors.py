@@ -12,4 +12,8 @@ class ValidationError(AppError):
 
 class ToolExecutionError(Exception):
     """Errors during tool execution"""
-    pass 
\ No newline at end of file
+    pass
+
+class BudgetExceededError(AppError):
+    """A conversation or user has used up its token budget"""
+    pass
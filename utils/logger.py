@@ -1,7 +1,142 @@
 import logging
-from typing import Any, Dict, List, Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+import atexit
 import json
-from core.messages import Message
+import queue
+import random
+
+if TYPE_CHECKING:
+    from core.messages import Message
+
+LOG_TEXT_FORMAT = '%(asctime)s - %(message)s'
+
+# Third-party loggers kept at WARNING whatever LOG_LEVEL is
+NOISY_LOGGERS = ['httpx', 'httpcore', 'asyncio', 'aiohttp', 'uvicorn', 'uvicorn.error', 'fastapi']
+
+_listener: Optional[QueueListener] = None
+
+def structured(category: str, **fields) -> Dict[str, Any]:
+    """Build a record's extra= from its sampling category and structured fields"""
+    return {'category': category, 'fields': fields}
+
+def truncate(text: str, max_chars: int) -> str:
+    if max_chars and len(text) > max_chars:
+        return f"{text[:max_chars]}... [{len(text) - max_chars} more chars]"
+    return text
+
+class SamplingFilter(logging.Filter):
+    """Keep a configured fraction of each category's records below WARNING"""
+    
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, 'category', None), 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+class TruncatingFormatter(logging.Formatter):
+    """Text formatter that caps the rendered message at max_chars"""
+    
+    def __init__(self, fmt: str = LOG_TEXT_FORMAT, max_chars: int = 0):
+        super().__init__(fmt)
+        self.max_chars = max_chars
+    
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        record.message = truncate(record.message, self.max_chars)
+        return super().formatMessage(record)
+
+class JsonFormatter(TruncatingFormatter):
+    """One JSON object per record with its category and structured fields"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'category': getattr(record, 'category', None),
+            'message': truncate(record.getMessage(), self.max_chars),
+            **{
+                name: truncate(value, self.max_chars) if isinstance(value, str) else value
+                for name, value in getattr(record, 'fields', {}).items()
+            }
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hand records to the listener thread unformatted, dropping them when the queue is full
+    
+    Messages are formatted on the listener thread, so log arguments must not
+    be mutated after the call - pass snapshots of anything that may change.
+    """
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def configure_logging(settings=None, level: Optional[str] = None) -> QueueListener:
+    """Route all logging through a queue so formatting and I/O stay off the event loop
+    
+    Idempotent; the listener thread is stopped at exit or by shutdown_logging.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+    if settings is None:
+        from core.settings import get_settings
+        settings = get_settings()
+    
+    output = logging.StreamHandler()
+    formatter = JsonFormatter if settings.LOG_FORMAT == "json" else TruncatingFormatter
+    output.setFormatter(formatter(LOG_TEXT_FORMAT, settings.LOG_MAX_MESSAGE_CHARS))
+    
+    handler = NonBlockingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+    handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES))
+    
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel((level or settings.LOG_LEVEL).upper())
+    for logger_name in NOISY_LOGGERS:
+        logging.getLogger(logger_name).setLevel(logging.WARNING)
+    
+    _listener = QueueListener(handler.queue, output)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread; later records are written directly"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    root = logging.getLogger()
+    dropped = 0
+    for handler in list(root.handlers):
+        if isinstance(handler, NonBlockingQueueHandler):
+            root.removeHandler(handler)
+            dropped += handler.dropped
+    for handler in _listener.handlers:
+        root.addHandler(handler)
+    _listener = None
+    if dropped:
+        logging.getLogger(__name__).warning(f"Dropped {dropped} log records while the log queue was full")
 
 def get_logger(name: str) -> logging.Logger:
     """Get a logger with standard formatting"""
@@ -12,65 +147,78 @@ def setup_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
     return logger
 
+class _Exchange:
+    """An LLM request's history, rendered only if its record is emitted"""
+    
+    def __init__(self, messages: List['Message'], tools: Optional[List[Dict]]):
+        self.messages = list(messages)
+        self.tools = tools
+    
+    def __str__(self) -> str:
+        lines = []
+        for msg in self.messages:
+            if msg.role == "user":
+                lines.append(f"User: {msg.content}")
+            elif msg.role == "assistant":
+                lines.append(f"Assistant: {msg.content}")
+                if msg.tool_calls:
+                    lines.append("Tool Calls: " + ", ".join(
+                        f"{tool_call.function.name}({tool_call.function.arguments})" for tool_call in msg.tool_calls
+                    ))
+            elif msg.role == "system":
+                lines.append(f"System: {len(msg.content or '')} chars of instructions")
+        if self.tools:
+            lines.append(f"Available Tools: {[t['function']['name'] for t in self.tools]}")
+        return "\n".join(lines)
+
+class _Response:
+    """An LLM reply, rendered only if its record is emitted"""
+    
+    def __init__(self, message: 'Message'):
+        self.message = message
+    
+    def __str__(self) -> str:
+        lines = []
+        if self.message.content:
+            lines.append(f"Content: {self.message.content}")
+        if self.message.tool_calls:
+            lines.append("Requested tools: " + ", ".join(
+                f"{tool_call.function.name}({tool_call.function.arguments})" for tool_call in self.message.tool_calls
+            ))
+        return "\n".join(lines)
+
 def log_conversation_start(logger: logging.Logger, conversation_id: str, thread_id: str):
     """Log the start of a conversation"""
-    logger.info("\n" + "=" * 80)
-    logger.info(f"Starting new conversation: {conversation_id} (Thread: {thread_id})")
-    logger.info("=" * 80)
+    logger.info("Starting new conversation: %s (Thread: %s)", conversation_id, thread_id,
+                extra=structured('conversation', conversation_id=conversation_id, thread_id=thread_id))
 
 def log_agent_handoff(logger: logging.Logger, from_agent: str, to_agent: str, context: str):
     """Log agent handoffs"""
-    logger.info("\n" + "-" * 60)
-    logger.info(f"🔄 {from_agent} transferring control to {to_agent}")
-    logger.info(f"Context: {context}")
-    logger.info("-" * 60)
-
-def log_openai_exchange(logger: logging.Logger, agent_name: str, messages: List[Message], tools: Optional[List[Dict]] = None):
-    """Log OpenAI exchange details"""
-    logger.info(f"\n=== {agent_name} OpenAI Exchange ===")
-    
-    # Log messages
-    for msg in messages:
-        if msg.role == "user":
-            logger.info(f"User: {msg.content}")
-        elif msg.role == "assistant":
-            logger.info(f"Assistant: {msg.content}")
-            if msg.tool_calls:
-                logger.info(f"Tool Calls: {msg.tool_calls}")
-        elif msg.role == "system":
-            logger.info(f"System: {msg.content}")
-    
-    # Log tools if any
-    if tools:
-        logger.info(f"Available Tools: {[t['function']['name'] for t in tools]}")
-
-def log_openai_response(logger: logging.Logger, agent_name: str, message: Message):
-    """Log OpenAI's response in a narrative format"""
-    logger.info("\n" + "▲" * 50)
-    logger.info(f"🤖 OpenAI's response to {agent_name}:")
-    
-    if message.content:
-        logger.info(f"Content: {message.content}")
-    
-    if message.tool_calls:
-        tool_name = message.tool_calls[0].function.name
-        logger.info(f"Requested tool: {tool_name}")
-    
-    logger.info("▲" * 50)
+    logger.info("🔄 %s transferring control to %s\nContext: %s", from_agent, to_agent, context,
+                extra=structured('routing', from_agent=from_agent, to_agent=to_agent))
+
+def log_openai_exchange(logger: logging.Logger, agent_name: str, messages: List['Message'], tools: Optional[List[Dict]] = None):
+    """Log OpenAI exchange details (category "exchange", rendered on the log thread)"""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("=== %s OpenAI Exchange ===\n%s", agent_name, _Exchange(messages, tools),
+                    extra=structured('exchange', agent=agent_name, messages=len(messages)))
+
+def log_openai_response(logger: logging.Logger, agent_name: str, message: 'Message'):
+    """Log OpenAI's response in a narrative format (category "response")"""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("🤖 OpenAI's response to %s:\n%s", agent_name, _Response(message),
+                    extra=structured('response', agent=agent_name, tool_calls=len(message.tool_calls or [])))
+
 def log_tool_execution(logger: logging.Logger, tool_name: str):
     """Log just the tool being executed"""
-    logger.info(f"🔧 Executing: {tool_name}")
+    logger.info("🔧 Executing: %s", tool_name, extra=structured('tool', tool=tool_name))
 
 def log_error(logger: logging.Logger, error: Exception, context: str = None):
     """Log errors with context"""
-    logger.error("\n" + "!" * 50)
-    logger.error("❌ Error occurred" + (f" during {context}" if context else ""))
-    logger.error(f"Type: {type(error).__name__}")
-    logger.error(f"Message: {str(error)}")
-    logger.error("!" * 50)
+    logger.error("❌ Error occurred%s - %s: %s", f" during {context}" if context else "", type(error).__name__, error,
+                 extra=structured('error', error_type=type(error).__name__))
 
 def log_conversation_end(logger: logging.Logger, conversation_id: str, status: str):
     """Log the end of a conversation"""
-    logger.info("\n" + "=" * 80)
-    logger.info(f"Ending conversation {conversation_id} with status: {status}")
-    logger.info("=" * 80)
+    logger.info("Ending conversation %s with status: %s", conversation_id, status,
+                extra=structured('conversation', conversation_id=conversation_id, status=status))